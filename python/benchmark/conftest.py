@@ -1,28 +1,112 @@
+import functools
+import hashlib
 import pytest
+import shutil
 import string
 import random
+import tempfile
+from pathlib import Path
 from rsdos import Container as RsContainer
-from disk_objectstore import Container as PyContainer
+from disk_objectstore import CompressMode, Container as PyContainer
+
+TMPFS_ROOT = Path("/dev/shm")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: benchmark on the disk, deselect with '-m \"not slow\"'"
+    )
+
+
+@pytest.fixture(
+    scope="function", params=["tmpfs", pytest.param("disk", marks=pytest.mark.slow)]
+)
+def storage_root(request, tmp_path):
+    """Folder of the container. On ``tmpfs`` the numbers are the CPU and FFI cost only, on
+    ``disk`` (pytest ``tmp_path``) they include the storage, comparing both tells whether an
+    operation is compute or I/O bound."""
+    if request.param == "disk":
+        yield tmp_path
+        return
+
+    if not TMPFS_ROOT.is_dir():
+        pytest.skip(f"no tmpfs at {TMPFS_ROOT}")
+    root = Path(tempfile.mkdtemp(dir=TMPFS_ROOT))
+    yield root
+    # tmpfs is memory, do not keep it until pytest cleans up old tmp folders
+    shutil.rmtree(root)
 
 
 @pytest.fixture(scope="function")
-def rs_container(tmp_path):
-    cnt = RsContainer(tmp_path)
-    cnt.init_container()
+def rs_container(storage_root):
+    cnt = RsContainer(storage_root)
+    # the container is thrown away after the test, no need to wait for the disk
+    cnt.init_container(durability="none")
     yield cnt
 
 
 @pytest.fixture(scope="function")
-def py_container(tmp_path):
-    with PyContainer(tmp_path) as cnt:
+def py_container(storage_root):
+    with PyContainer(storage_root) as cnt:
         cnt.init_container()
         yield cnt
 
 
+def _get_n_bytes(n: int):
+    ascii_chars = string.ascii_letters + string.digits + string.punctuation
+    return "".join(random.choices(ascii_chars, k=n))
+
+
 @pytest.fixture(scope="function")
 def gen_n_bytes():
-    def _get_n_bytes(n: int):
-        ascii_chars = string.ascii_letters + string.digits + string.punctuation
-        return "".join(random.choices(ascii_chars, k=n))
-
     return _get_n_bytes
+
+
+@pytest.fixture(scope="session")
+def payloads():
+    """``(data_content, expected_hashkeys)`` of ``n`` small objects, computed once per session for
+    every ``n`` so the benchmark setup does not recompute the sha256 of the same contents.
+    The lists are shared between tests, do not modify them."""
+
+    @functools.lru_cache(maxsize=None)
+    def _payloads(n: int):
+        data_content = [str(i).encode("ascii") for i in range(n)]
+        expected_hashkeys = [
+            hashlib.sha256(content).hexdigest() for content in data_content
+        ]
+        return data_content, expected_hashkeys
+
+    return _payloads
+
+
+@pytest.fixture(scope="session")
+def repeated_payloads():
+    """Same as ``payloads`` for ``n`` objects of 8 random chars repeated ``nrepeat`` times, computed
+    once per session for every ``(n, nrepeat)``. The rsdos and legacy dos benchmarks of the same
+    parameters then write the same contents."""
+
+    @functools.lru_cache(maxsize=None)
+    def _payloads(n: int, nrepeat: int):
+        data_content = [_get_n_bytes(8).encode("ascii") * nrepeat for _ in range(n)]
+        expected_hashkeys = [
+            hashlib.sha256(content).hexdigest() for content in data_content
+        ]
+        return data_content, expected_hashkeys
+
+    return _payloads
+
+
+@pytest.fixture(
+    scope="session",
+    params=[CompressMode.YES, CompressMode.NO],
+    ids=lambda mode: f"compress_{mode.value}",
+)
+def packed_rs_container_10000(request, tmp_path_factory, payloads):
+    """``(cnt, hashkeys, expected_results_dict)`` of a rsdos container with 10'000 objects in
+    packs, populated once per session for every compress mode and shared by the read benchmarks.
+    The read benchmarks must not write to it, and copy ``hashkeys`` before shuffling it."""
+    cnt = RsContainer(tmp_path_factory.mktemp("packed_rs"))
+    cnt.init_container(durability="none")
+    data_content, expected_hashkeys = payloads(10000)
+    hashkeys = cnt.add_objects_to_pack(data_content, compress=request.param)
+    return cnt, hashkeys, dict(zip(expected_hashkeys, data_content))
@@ -56,13 +56,11 @@ def test_loose_write_single_py(py_container, benchmark):
 
 
 @pytest.mark.benchmark(group="read_1000")
-def test_loose_read_rs(benchmark, rs_container):
+def test_loose_read_rs(benchmark, rs_container, payloads):
     """Add 1'000 objects to the container in loose form, and benchmark write and read speed."""
     num_files = 1000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    hashkeys = []
-    for content in data_content:
-        hashkeys.append(rs_container.add_object(content))
+    data_content, _ = payloads(num_files)
+    hashkeys = rs_container.add_objects(data_content)
     expected_results = dict(zip(hashkeys, data_content))
 
     random.shuffle(hashkeys)
@@ -73,10 +71,10 @@ def test_loose_read_rs(benchmark, rs_container):
 
 
 @pytest.mark.benchmark(group="read_1000")
-def test_loose_read_py(benchmark, py_container):
+def test_loose_read_py(benchmark, py_container, payloads):
     """Add 1'000 objects to the container in loose form, and benchmark write and read speed."""
     num_files = 1000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
+    data_content, _ = payloads(num_files)
     hashkeys = []
     for content in data_content:
         hashkeys.append(py_container.add_object(content))
@@ -89,13 +87,23 @@ def test_loose_read_py(benchmark, py_container):
 
 
 @pytest.mark.benchmark(group="write_1000", min_rounds=3)
-def test_loose_write_rs(rs_container, benchmark):
+def test_loose_write_rs(rs_container, benchmark, payloads):
     """Add 1'000 objects to the container in packed form, and benchmark write and read speed."""
     num_files = 1000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
+    data_content, expected_hashkeys = payloads(num_files)
+
+    # the whole batch is written in one call to rust
+    hashkeys = benchmark(rs_container.add_objects, data_content)
+
+    assert len(hashkeys) == len(data_content)
+    assert expected_hashkeys == hashkeys
+
+
+@pytest.mark.benchmark(group="write_1000", min_rounds=3)
+def test_loose_write_one_by_one_rs(rs_container, benchmark, payloads):
+    """Add 1'000 objects to the container in loose form one ``add_object`` call at a time."""
+    num_files = 1000
+    data_content, expected_hashkeys = payloads(num_files)
 
     def write_loose(rs_container, contents):
         retval = []
@@ -110,13 +118,10 @@ def test_loose_write_rs(rs_container, benchmark):
 
 
 @pytest.mark.benchmark(group="write_1000", min_rounds=3)
-def test_loose_write_py(py_container, benchmark):
+def test_loose_write_py(py_container, benchmark, payloads):
     """Add 1'000 objects to the container in packed form, and benchmark write and read speed."""
     num_files = 1000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
+    data_content, expected_hashkeys = payloads(num_files)
 
     def write_loose(py_container, contents):
         retval = []
@@ -131,9 +136,9 @@ def test_loose_write_py(py_container, benchmark):
 
 
 @pytest.mark.benchmark(group="count_10_000", min_rounds=3)
-def test_count_10000_py(py_container, benchmark):
+def test_count_10000_py(py_container, benchmark, payloads):
     num_files = 10000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
+    data_content, _ = payloads(num_files)
     for content in data_content:
         py_container.add_object(content)
 
@@ -143,11 +148,10 @@ def test_count_10000_py(py_container, benchmark):
 
 
 @pytest.mark.benchmark(group="count_10_000", min_rounds=3)
-def test_count_10000_rs(rs_container, benchmark):
+def test_count_10000_rs(rs_container, benchmark, payloads):
     num_files = 10000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    for content in data_content:
-        rs_container.add_object(content)
+    data_content, _ = payloads(num_files)
+    rs_container.add_objects(data_content)
 
     n_objs = benchmark(rs_container.count_objects)
 
@@ -155,9 +159,9 @@ def test_count_10000_rs(rs_container, benchmark):
 
 
 @pytest.mark.benchmark(group="total_size_10_000", min_rounds=3)
-def test_get_total_size_10000_py(py_container, benchmark):
+def test_get_total_size_10000_py(py_container, benchmark, payloads):
     num_files = 10000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
+    data_content, _ = payloads(num_files)
     for content in data_content:
         py_container.add_object(content)
 
@@ -167,11 +171,10 @@ def test_get_total_size_10000_py(py_container, benchmark):
 
 
 @pytest.mark.benchmark(group="total_size_10_000", min_rounds=3)
-def test_get_total_size_10000_rs(rs_container, benchmark):
+def test_get_total_size_10000_rs(rs_container, benchmark, payloads):
     num_files = 10000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    for content in data_content:
-        rs_container.add_object(content)
+    data_content, _ = payloads(num_files)
+    rs_container.add_objects(data_content)
 
     total_size = benchmark(rs_container.get_total_size)
 
@@ -1,6 +1,6 @@
 import pytest
 from disk_objectstore import Container as PyContainer
-from pathlib import Path
+import os
 import shutil
 from rsdos import Container as RsContainer
 
@@ -9,13 +9,31 @@ from rsdos import Container as RsContainer
 from disk_objectstore import CompressMode
 
 
-def reset_packs(folder_path: Path):
-    # Remove the folder and its contents
-    if folder_path.exists():
-        shutil.rmtree(folder_path)
+# ``pack_all_loose`` is run once per round, with the packs reset in the setup of the round.
+ROUNDS = 5
+
+
+def reset_packs_py(cnt: PyContainer):
+    """Setup of a round, not timed: remove the packs and the index of the legacy container."""
+    folder = cnt.get_folder()
+    # one pass over the container folder for both the packs folder and the packs.idx-* files
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == "packs":
+                shutil.rmtree(entry.path)
+            elif entry.name.startswith("packs.idx"):
+                os.unlink(entry.path)
 
     # Recreate the empty folder
-    Path.mkdir(folder_path)
+    (folder / "packs").mkdir()
+
+    # clean up the db session for next run to avoid reuse
+    cnt._get_session(create=True)
+
+
+def reset_packs_rs(cnt: RsContainer):
+    """Setup of a round, not timed: remove the packs, the DB is emptied rather than recreated."""
+    cnt._clear_packs()
 
 
 @pytest.mark.parametrize(
@@ -40,25 +58,18 @@ def test_pack_loose_10_py(benchmark, tmp_path, compress_mode, nrepeat, gen_n_byt
 
         num_files = 10
         data_content = [
-            (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
+            gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)
         ]
         hashkeys = []
         for content in data_content:
             hashkeys.append(cnt.add_object(content))
 
-        def pack_all_loose():
-            cnt.pack_all_loose(compress_mode)
-            reset_packs(cnt.get_folder() / "packs")
-
-            # delete all packs.idx-*
-            for pack_file in cnt.get_folder().glob("packs.idx*"):
-                pack_file.unlink()
-
-            # clean up the db session for next run to avoid reuse
-            cnt._get_session(create=True)
-            cnt.close()
-
-        benchmark(pack_all_loose)
+        benchmark.pedantic(
+            cnt.pack_all_loose,
+            args=(compress_mode,),
+            setup=lambda: reset_packs_py(cnt),
+            rounds=ROUNDS,
+        )
 
 
 @pytest.mark.parametrize(
@@ -78,30 +89,22 @@ def test_pack_loose_10_rs(benchmark, tmp_path, compress_mode, nrepeat, gen_n_byt
     """Add 10 objects to the container in loose form, and benchmark pack_all_loose speed."""
     cnt = RsContainer(tmp_path)
     cnt.init_container(
-        pack_size_target=4 * 1024 * 1024 * 1024, compression_algorithm="zlib+1"
+        pack_size_target=4 * 1024 * 1024 * 1024,
+        compression_algorithm="zlib+1",
+        durability="none",
     )
 
     num_files = 10
-    data_content = [
-        (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-    ]
-    hashkeys = []
-    for content in data_content:
-        hashkey = cnt.add_object(content)
-        hashkeys.append(hashkey)
-
-    def pack_all_loose():
-        cnt.pack_all_loose(compress_mode)
-        reset_packs(cnt.get_folder() / "packs")
-
-        # delete all packs.idx-*
-        for pack_file in cnt.get_folder().glob("packs.idx*"):
-            pack_file.unlink()
-
-        # clean up the db session for next run to avoid reuse
-        cnt._init_db()
-
-    benchmark(pack_all_loose)
+    data_content = [gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)]
+    # loose objects are added in one call to rust, it is not what is timed
+    cnt.add_objects(data_content)
+
+    benchmark.pedantic(
+        cnt.pack_all_loose,
+        args=(compress_mode,),
+        setup=lambda: reset_packs_rs(cnt),
+        rounds=ROUNDS,
+    )
 
 
 @pytest.mark.skip(
@@ -120,26 +123,19 @@ def test_pack_loose_too_many_open_files_py_xfail(benchmark, tmp_path, gen_n_byte
 
     num_files = 1000
     nrepeat = 64
-    data_content = [
-        (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-    ]
+    data_content = [gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)]
     hashkeys = []
     for content in data_content:
         hashkey = cnt.add_object(content)
         hashkeys.append(hashkey)
 
-    def pack_all_loose():
-        cnt.pack_all_loose(compress_mode)
-        reset_packs(cnt.get_folder() / "packs")
-
-        # delete all packs.idx-*
-        for pack_file in cnt.get_folder().glob("packs.idx*"):
-            pack_file.unlink()
-
-        cnt._get_session(create=True)
-
     # Note that here however the OS will be using the disk caches
-    benchmark(pack_all_loose)
+    benchmark.pedantic(
+        cnt.pack_all_loose,
+        args=(compress_mode,),
+        setup=lambda: reset_packs_py(cnt),
+        rounds=ROUNDS,
+    )
 
 
 def test_pack_loose_too_many_open_files_py(benchmark, tmp_path, gen_n_bytes):
@@ -154,25 +150,20 @@ def test_pack_loose_too_many_open_files_py(benchmark, tmp_path, gen_n_bytes):
         num_files = 1000
         nrepeat = 5 * 1024  # 5 KiB
         data_content = [
-            (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
+            gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)
         ]
         hashkeys = []
         for content in data_content:
             hashkey = cnt.add_object(content)
             hashkeys.append(hashkey)
 
-        def pack_all_loose():
-            cnt.pack_all_loose(compress_mode)
-            reset_packs(cnt.get_folder() / "packs")
-
-            # delete all packs.idx-*
-            for pack_file in cnt.get_folder().glob("packs.idx*"):
-                pack_file.unlink()
-
-            cnt._get_session(create=True)
-
         # Note that here however the OS will be using the disk caches
-        benchmark(pack_all_loose)
+        benchmark.pedantic(
+            cnt.pack_all_loose,
+            args=(compress_mode,),
+            setup=lambda: reset_packs_py(cnt),
+            rounds=ROUNDS,
+        )
 
 
 def test_pack_loose_too_many_open_files_rs(benchmark, tmp_path, gen_n_bytes):
@@ -182,31 +173,27 @@ def test_pack_loose_too_many_open_files_rs(benchmark, tmp_path, gen_n_bytes):
     2. pack file only open once for a sequential write.
     """
     cnt = RsContainer(tmp_path)
-    cnt.init_container(pack_size_target=4 * 1024 * 1024, compression_algorithm="zlib+1")
+    cnt.init_container(
+        pack_size_target=4 * 1024 * 1024,
+        compression_algorithm="zlib+1",
+        durability="none",
+    )
 
     compress_mode = CompressMode.NO
 
     num_files = 1000
     nrepeat = 5 * 1024  # 5 KiB
-    data_content = [
-        (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-    ]
-    hashkeys = []
-    for content in data_content:
-        hashkeys.append(cnt.add_object(content))
-
-    def pack_all_loose():
-        cnt.pack_all_loose(compress_mode)
-        reset_packs(cnt.get_folder() / "packs")
-
-        # delete all packs.idx-*
-        for pack_file in cnt.get_folder().glob("packs.idx*"):
-            pack_file.unlink()
-
-        cnt._init_db()
+    data_content = [gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)]
+    # loose objects are added in one call to rust, it is not what is timed
+    cnt.add_objects(data_content)
 
     # Note that here however the OS will be using the disk caches
-    benchmark(pack_all_loose)
+    benchmark.pedantic(
+        cnt.pack_all_loose,
+        args=(compress_mode,),
+        setup=lambda: reset_packs_rs(cnt),
+        rounds=ROUNDS,
+    )
 
 
 @pytest.mark.parametrize(
@@ -228,25 +215,19 @@ def test_pack_loose_over_many_packs_py(
 
         num_files = 200
         data_content = [
-            (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
+            gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)
         ]
         hashkeys = []
         for content in data_content:
             hashkeys.append(cnt.add_object(content))
 
-        def pack_all_loose():
-            cnt.pack_all_loose(compress_mode)
-            reset_packs(cnt.get_folder() / "packs")
-
-            # delete all packs.idx-*
-            for pack_file in cnt.get_folder().glob("packs.idx*"):
-                pack_file.unlink()
-
-            cnt._get_session(create=True)
-            # the session is open in mem need to clean up for next run
-
         # Note that here however the OS will be using the disk caches
-        benchmark(pack_all_loose)
+        benchmark.pedantic(
+            cnt.pack_all_loose,
+            args=(compress_mode,),
+            setup=lambda: reset_packs_py(cnt),
+            rounds=ROUNDS,
+        )
 
 
 @pytest.mark.parametrize(
@@ -264,25 +245,19 @@ def test_pack_loose_over_many_packs_rs(
     The first case will create many packed files, the second one has large target size that will have id = 0 pack open and written
     """
     cnt = RsContainer(tmp_path)
-    cnt.init_container(pack_size_target=pack_size, compression_algorithm="zlib+1")
+    cnt.init_container(
+        pack_size_target=pack_size, compression_algorithm="zlib+1", durability="none"
+    )
 
     num_files = 200
-    data_content = [
-        (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-    ]
-    hashkeys = []
-    for content in data_content:
-        hashkeys.append(cnt.add_object(content))
-
-    def pack_all_loose():
-        cnt.pack_all_loose(compress_mode)
-        reset_packs(cnt.get_folder() / "packs")
-
-        # delete all packs.idx-*
-        for pack_file in cnt.get_folder().glob("packs.idx*"):
-            pack_file.unlink()
-
-        cnt._init_db()
+    data_content = [gen_n_bytes(8).encode("ascii") * nrepeat for _ in range(num_files)]
+    # loose objects are added in one call to rust, it is not what is timed
+    cnt.add_objects(data_content)
 
     # Note that here however the OS will be using the disk caches
-    benchmark(pack_all_loose)
+    benchmark.pedantic(
+        cnt.pack_all_loose,
+        args=(compress_mode,),
+        setup=lambda: reset_packs_rs(cnt),
+        rounds=ROUNDS,
+    )
@@ -1,33 +1,19 @@
 from disk_objectstore import CompressMode, Container as PyContainer
 from rsdos import Container as RsContainer
 import pytest
-import hashlib
 import random
 
 
-@pytest.mark.parametrize(
-    "compress_mode",
-    [CompressMode.YES, CompressMode.NO],
-)
 @pytest.mark.benchmark(group="read_single")
-def test_packs_read_single_rs(benchmark, tmp_path, compress_mode):
-    """Add 10'000 objects to the container in loose form, and benchmark write and read speed."""
-    cnt = RsContainer(tmp_path)
-    cnt.init_container()
-    num_files = 1
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
-    expected_results_dict = dict(zip(expected_hashkeys, data_content))
-
-    # XXX: seems pack add can be further improved
-    hashkeys = cnt.add_objects_to_pack(data_content, compress=compress_mode)
-    random.shuffle(hashkeys)
+def test_packs_read_single_rs(benchmark, packed_rs_container_10000):
+    """Add 10'000 objects to the container in packed form, and benchmark read speed of one."""
+    cnt, hashkeys, expected_results_dict = packed_rs_container_10000
+
+    hashkey = random.choice(hashkeys)
     # Note that here however the OS will be using the disk caches
-    result = benchmark(cnt.get_object_content, hashkeys[0])
+    result = benchmark(cnt.get_object_content, hashkey)
 
-    assert result == expected_results_dict[hashkeys[0]]
+    assert result == expected_results_dict[hashkey]
 
 
 @pytest.mark.parametrize(
@@ -38,15 +24,12 @@ def test_packs_read_single_rs(benchmark, tmp_path, compress_mode):
     ],
 )
 @pytest.mark.benchmark(group="read_single")
-def test_packs_read_single_py(benchmark, tmp_path, compress_mode):
+def test_packs_read_single_py(benchmark, tmp_path, compress_mode, payloads):
     """Add 10'000 objects to the container in loose form, and benchmark write and read speed."""
     with PyContainer(tmp_path) as cnt:
         cnt.init_container()
         num_files = 10000
-        data_content = [str(i).encode("ascii") for i in range(num_files)]
-        expected_hashkeys = [
-            hashlib.sha256(content).hexdigest() for content in data_content
-        ]
+        data_content, expected_hashkeys = payloads(num_files)
         expected_results_dict = dict(zip(expected_hashkeys, data_content))
 
         hashkeys = cnt.add_objects_to_pack(data_content, compress=compress_mode)
@@ -57,30 +40,38 @@ def test_packs_read_single_py(benchmark, tmp_path, compress_mode):
         assert result == expected_results_dict[hashkeys[0]]
 
 
-@pytest.mark.parametrize(
-    "compress_mode",
-    [CompressMode.YES, CompressMode.NO],
-)
 @pytest.mark.benchmark(group="read_10000")
-def test_packs_read_rs(benchmark, tmp_path, compress_mode):
-    """Add 10'000 objects to the container in loose form, and benchmark write and read speed."""
-    cnt = RsContainer(tmp_path)
-    cnt.init_container()
-    num_files = 10000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
-    expected_results_dict = dict(zip(expected_hashkeys, data_content))
-
-    hashkeys = cnt.add_objects_to_pack(data_content, compress=compress_mode)
-    random.shuffle(hashkeys)
+def test_packs_read_rs(benchmark, packed_rs_container_10000):
+    """Add 10'000 objects to the container in packed form, and benchmark read speed."""
+    cnt, hashkeys, expected_results_dict = packed_rs_container_10000
+
+    # a shuffled copy, the hashkeys of the fixture are shared
+    hashkeys = random.sample(hashkeys, len(hashkeys))
     # Note that here however the OS will be using the disk caches
     results = benchmark(cnt.get_objects_content, hashkeys)
 
     assert results == expected_results_dict
 
 
+@pytest.mark.benchmark(group="read_10000")
+def test_packs_read_into_rs(benchmark, packed_rs_container_10000):
+    """Add 10'000 objects to the container in packed form, and benchmark read speed into one
+    reused buffer."""
+    cnt, hashkeys, expected_results_dict = packed_rs_container_10000
+
+    hashkeys = random.sample(hashkeys, len(hashkeys))
+    buffer = bytearray(sum(len(content) for content in expected_results_dict.values()))
+    # Note that here however the OS will be using the disk caches
+    spans = benchmark(cnt.get_objects_content_into, hashkeys, buffer)
+
+    view = memoryview(buffer)
+    results = {
+        hashkey: view[offset : offset + size].tobytes()
+        for hashkey, (offset, size) in zip(hashkeys, spans)
+    }
+    assert results == expected_results_dict
+
+
 @pytest.mark.parametrize(
     "compress_mode",
     [
@@ -89,15 +80,12 @@ def test_packs_read_rs(benchmark, tmp_path, compress_mode):
     ],
 )
 @pytest.mark.benchmark(group="read_10000")
-def test_packs_read_py(benchmark, tmp_path, compress_mode):
+def test_packs_read_py(benchmark, tmp_path, compress_mode, payloads):
     """Add 10'000 objects to the container in loose form, and benchmark write and read speed."""
     with PyContainer(tmp_path) as cnt:
         cnt.init_container()
         num_files = 10000
-        data_content = [str(i).encode("ascii") for i in range(num_files)]
-        expected_hashkeys = [
-            hashlib.sha256(content).hexdigest() for content in data_content
-        ]
+        data_content, expected_hashkeys = payloads(num_files)
         expected_results_dict = dict(zip(expected_hashkeys, data_content))
 
         hashkeys = cnt.add_objects_to_pack(data_content, compress=compress_mode)
@@ -113,15 +101,12 @@ def test_packs_read_py(benchmark, tmp_path, compress_mode):
     [CompressMode.YES, CompressMode.NO],
 )
 @pytest.mark.benchmark(group="write_1_packs", min_rounds=3)
-def test_packs_write_single_rs(benchmark, tmp_path, compress_mode):
+def test_packs_write_single_rs(benchmark, tmp_path, compress_mode, payloads):
     """Add 1 objects to the container in packed form, and benchmark write and read speed."""
     cnt = RsContainer(tmp_path)
-    cnt.init_container()
+    cnt.init_container(durability="none")
     num_files = 1
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
+    data_content, expected_hashkeys = payloads(num_files)
 
     hashkeys = benchmark(cnt.add_objects_to_pack, data_content, compress=compress_mode)
 
@@ -134,15 +119,12 @@ def test_packs_write_single_rs(benchmark, tmp_path, compress_mode):
     [CompressMode.YES, CompressMode.NO],
 )
 @pytest.mark.benchmark(group="write_1_packs", min_rounds=3)
-def test_packs_write_single_1000_rs(benchmark, tmp_path, compress_mode):
+def test_packs_write_single_1000_rs(benchmark, tmp_path, compress_mode, payloads):
     """Add 1'000 objects to the container in packed form, and benchmark write and read speed."""
     cnt = RsContainer(tmp_path)
-    cnt.init_container()
+    cnt.init_container(durability="none")
     num_files = 1000
-    data_content = [str(i).encode("ascii") for i in range(num_files)]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
+    data_content, expected_hashkeys = payloads(num_files)
 
     hashkeys = benchmark(cnt.add_objects_to_pack, data_content, compress=compress_mode)
 
@@ -163,17 +145,12 @@ def test_packs_write_single_1000_rs(benchmark, tmp_path, compress_mode):
     ],
 )
 @pytest.mark.benchmark(group="write_10_packs", min_rounds=2)
-def test_packs_write_rs(benchmark, tmp_path, compress_mode, nrepeat, gen_n_bytes):
+def test_packs_write_rs(benchmark, tmp_path, compress_mode, nrepeat, repeated_payloads):
     """Add 10 objects to the container in packed form, and benchmark write and read speed."""
     cnt = RsContainer(tmp_path)
-    cnt.init_container()
+    cnt.init_container(durability="none")
     num_files = 10
-    data_content = [
-        (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-    ]
-    expected_hashkeys = [
-        hashlib.sha256(content).hexdigest() for content in data_content
-    ]
+    data_content, expected_hashkeys = repeated_payloads(num_files, nrepeat)
 
     hashkeys = benchmark(cnt.add_objects_to_pack, data_content, compress=compress_mode)
 
@@ -195,17 +172,12 @@ def test_packs_write_rs(benchmark, tmp_path, compress_mode, nrepeat, gen_n_bytes
     ],
 )
 @pytest.mark.benchmark(group="write_10_packs", min_rounds=2)
-def test_packs_write_py(benchmark, tmp_path, compress_mode, nrepeat, gen_n_bytes):
+def test_packs_write_py(benchmark, tmp_path, compress_mode, nrepeat, repeated_payloads):
     """Add 10 objects to the container in packed form, and benchmark write and read speed."""
     with PyContainer(tmp_path) as cnt:
         cnt.init_container()
         num_files = 10
-        data_content = [
-            (gen_n_bytes(8) * nrepeat).encode("ascii") for _ in range(num_files)
-        ]
-        expected_hashkeys = [
-            hashlib.sha256(content).hexdigest() for content in data_content
-        ]
+        data_content, expected_hashkeys = repeated_payloads(num_files, nrepeat)
 
         hashkeys = benchmark(
             cnt.add_objects_to_pack, data_content, compress=compress_mode
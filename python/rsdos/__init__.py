@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from contextlib import contextmanager
+import itertools
 import typing as t
 import io
 from pathlib import Path
-from .rsdos import _Container, run_cli
+from .rsdos import _Container, run_cli, EXTRACT_CHUNK_SIZE
 from enum import Enum
 
 __all__ = ("Container", "run_cli")
@@ -46,99 +47,107 @@ class Container:
     def _init_db(self):
         self.cnt._init_db()
 
+    def _clear_packs(self):
+        """Remove all packed objects (loose objects are kept), to reset a throwaway container."""
+        self.cnt._clear_packs()
+
     def get_folder(self) -> Path:
         return Path(self.cnt.get_folder())
 
-    def _fetch_from_loose(self, hashkey: str, stream: StreamBytesType):
-        self.cnt.write_stream_from_loose(hashkey, stream)
-
     def iter_objects_stream_loose(
         self, hashkeys: t.List[str], skip_if_missing: bool = True
     ) -> Iterator[t.Tuple[str, t.Optional[StreamReadBytesType]]]:
+        # bind the method once, not looked up from ``self.cnt`` for every hashkey
+        stream_one_from_loose = self.cnt.stream_one_from_loose
         for hashkey in hashkeys:
-            stream = io.BytesIO()
-            try:
-                self._fetch_from_loose(hashkey, stream)
+            stream = stream_one_from_loose(hashkey)
+            if stream is not None:
                 yield (hashkey, stream)
-            except ValueError as exc:
-                if skip_if_missing:
-                    yield (hashkey, None)
-                else:
-                    raise exc from None
-
-    def _fetch_from_packs(self, hashkey: str, stream: StreamBytesType):
-        self.cnt.write_stream_from_packs(hashkey, stream)
+            elif skip_if_missing:
+                yield (hashkey, None)
+            else:
+                raise ValueError(f"{hashkey} not found")
 
     def iter_objects_stream_packs(
-        self, hashkeys: t.List[str], skip_if_missing: bool = True
+        self, hashkeys: Iterable[str], skip_if_missing: bool = True
     ) -> Iterator[t.Tuple[str, t.Optional[StreamReadBytesType]]]:
-        for hashkey in hashkeys:
-            stream = io.BytesIO()
-            try:
-                self._fetch_from_packs(hashkey, stream)
+        # one index query per chunk of hashkeys rather than one per hashkey, chunked as the packs
+        # DB is queried in rust. The content is only read when the stream is read, so this does
+        # not bound memory by content size. Any iterable of hashkeys works, e.g. a generator.
+        hashkeys = iter(hashkeys)
+        while chunk := list(itertools.islice(hashkeys, EXTRACT_CHUNK_SIZE)):
+            yield from self._iter_chunk_stream_packs(chunk, skip_if_missing)
+
+    def _iter_chunk_stream_packs(
+        self, hashkeys: t.List[str], skip_if_missing: bool
+    ) -> Iterator[t.Tuple[str, t.Optional[StreamReadBytesType]]]:
+        streams = self.cnt.stream_many_from_packs(hashkeys)
+        for hashkey, stream in zip(hashkeys, streams):
+            if stream is not None:
                 yield (hashkey, stream)
-            except ValueError as exc:
-                if skip_if_missing:
-                    yield (hashkey, None)
-                else:
-                    raise exc from None
+            elif skip_if_missing:
+                yield (hashkey, None)
+            else:
+                raise ValueError(f"{hashkey} not found")
 
     def get_object_content(self, hashkey: str) -> bytes | None:
-        with self.get_object_stream(hashkey) as fh:
-            if fh is not None:
-                return fh.read()
-            else:
-                return None
+        # try fetch from loose, if not found try fetch from packs
+        content = self.cnt.extract_one_from_loose(hashkey)
+        if content is None:
+            content = self.cnt.extract_one_from_packs(hashkey)
+        return content
+
+    def get_object_content_into(
+        self, hashkey: str, buffer: t.Union[bytearray, memoryview]
+    ) -> int:
+        """Write the object content into the writable buffer from the caller (which can be reused
+        between calls) and return the number of bytes written. Raise ``ValueError`` if not found.
+        A ``bytearray`` is written in place, other buffers such as a ``memoryview`` take one extra
+        copy of the content."""
+        return self.cnt.get_object_content_into(hashkey, buffer)
+
+    def get_objects_content_into(
+        self, hashkeys: t.List[str], buffer: bytearray
+    ) -> t.List[t.Optional[t.Tuple[int, int]]]:
+        """Write the content of the objects one after another into the ``bytearray`` buffer, no
+        ``bytes`` is created per object. Return for every hashkey the ``(offset, size)`` of its
+        content in ``buffer``, or ``None`` if not found (a repeated hashkey gets the same span).
+        Raise ``ValueError`` if the buffer is too small for all of them, nothing is written then."""
+        return self.cnt.get_objects_content_into(hashkeys, buffer)
 
     @contextmanager
     def get_object_stream(self, hashkey: str) -> Iterator[StreamReadBytesType | None]:
-        stream = io.BytesIO()
-        try:
-            # try fetch from loose
-            self._fetch_from_loose(hashkey, stream)
-        except ValueError:
-            try:
-                # not found in loose, try fetch from packs
-                self._fetch_from_packs(hashkey, stream)
-            except ValueError:
-                yield None
-            else:
-                yield stream
+        content = self.get_object_content(hashkey)
+        if content is None:
+            yield None
         else:
-            yield stream
+            yield io.BytesIO(content)
 
     def get_objects_content(
         self, hashkeys: t.List[str], skip_if_missing: bool = True
     ) -> t.Dict[str, t.Optional[bytes]]:
-        d, not_found = self.get_loose_objects_content_raw_rs(hashkeys, skip_if_missing)
-
-        # what not found in loose, try to find in packs
-        # packs XXX: large speed overhead even no object in packs
-        for k, v in self.cnt.extract_many_from_packs(not_found).items():
-            d[k] = bytes(v)
-
-        return d
+        # one call for loose and at most one call for packs, no per-object round-trip
+        loose = self.cnt.extract_many_from_loose(hashkeys)
+        not_found = [k for k, v in loose.items() if v is None]
 
-    def get_loose_objects_content_raw_rs(
-        self, hashkeys: t.List[str], skip_if_missing: bool = True
-    ) -> t.Tuple[t.Dict[str, t.Optional[bytes]], t.List[str]]:
-        d = {}
-        not_found = []
-        for k, v in self.cnt.extract_many_from_loose(hashkeys).items():
-            if v is not None:
-                d[k] = bytes(v)
-            else:
-                not_found.append(k)
-                if skip_if_missing:
-                    continue
-                else:
-                    d[k] = None
+        # what not found in loose, try to find in packs.
+        # Skip the packs lookup if everything is found in loose, it opens the DB for nothing.
+        packs = self.cnt.extract_many_from_packs(not_found) if not_found else {}
+        merged = {**loose, **packs}
 
-        return d, not_found
+        return {
+            k: v for k, v in merged.items() if v is not None or not skip_if_missing
+        }
 
     def add_object(self, content: bytes) -> str:
-        stream = io.BytesIO(content)
-        return self.add_streamed_object(stream)
+        _, hashkey = self.cnt.insert_bytes_to_loose(content)
+        return hashkey
+
+    def add_objects(
+        self, content_list: t.Union[t.List[bytes], t.Tuple[bytes, ...]]
+    ) -> t.List[str]:
+        """Add a batch of objects to the loose store in a single call to rust."""
+        return self.cnt.insert_many_to_loose(content_list)
 
     def add_object_to_packs(self, content: bytes) -> str:
         stream = io.BytesIO(content)
@@ -165,11 +174,7 @@ class Container:
                 compress_mode = CompressMode.NO
         else:
             compress_mode = compress
-        hkey_lst = [
-            i[2]
-            for i in self.cnt.insert_many_to_packs(content_list, compress_mode.value)
-        ]
-        return hkey_lst
+        return self.cnt.insert_many_to_packs(content_list, compress_mode.value)
 
     def add_streamed_object(self, stream: StreamReadBytesType) -> str:
         _, hashkey = self.cnt.insert_to_loose(stream)
@@ -187,27 +192,36 @@ class Container:
         pack_size_target: int = 4 * 1024 * 1024 * 1024,
         loose_prefix_len: int = 2,
         hash_type: str = "sha256",
-        compression_algorithm: str = "zlib:+1",
+        compression_algorithm: str = "zstd:+1",
+        durability: str = "normal",
     ) -> None:
-        self.cnt.init_container(pack_size_target, compression_algorithm)
+        """``compression_algorithm`` is ``"<algo>:<level>"`` with ``zstd`` (default, level 1) or
+        ``zlib``, use ``"zlib+1"`` for packs that legacy dos can read.
+        ``durability`` is how hard writes to the packs index are synced to disk for this
+        object: ``"normal"`` (default), ``"full"``, or ``"none"`` which never waits for the disk
+        and is only meant for throwaway containers such as in benchmarks."""
+        self.cnt.init_container(pack_size_target, compression_algorithm, durability)
 
     @property
     def is_initialised(self) -> bool:
         return self.cnt.is_initialised
 
     def list_all_objects(self) -> Iterator[str]:
-        """For loose it simply traverse the filename in loose store, so never will be the bottleneck
-        I'll just use the python implementation. Using PyO3 to return iterator is complex."""
-        for first_level in Path(self.get_folder() / "loose").iterdir():
-            # if not self._is_valid_loose_prefix(first_level):
-            #     continue
-            for second_level in Path(
-                self.get_folder() / "loose" / first_level
-            ).iterdir():
-                hashkey = f"{first_level}{second_level}"
-                # if not self._is_valid_hashkey(hashkey):
-                #     continue
-                yield hashkey
+        """For loose it simply traverse the filename in loose store. The traverse is done in rust and
+        all hashkeys come back as one list, so no ``Path`` object is created per entry."""
+        yield from self.cnt.list_loose()
+
+    def list_all_objects_raw(self) -> t.List[bytes]:
+        """Same as ``list_all_objects`` but the hashkeys of loose are returned as raw bytes (the
+        digest, not its hex), decoded in rust."""
+        return self.cnt.list_loose_raw()
+
+    def load_packs_index(self) -> int:
+        """Load the index of packed objects in memory, for containers that are mostly read.
+        ``get_object_content`` and ``get_objects_content`` then look up packed objects without
+        querying SQLite, objects packed after loading are still found. Return the number of
+        objects in the index."""
+        return self.cnt.load_packs_index()
 
     def get_total_size(self) -> int:
         return self.cnt.get_total_size()
@@ -232,4 +246,4 @@ class Container:
                 compress_mode = CompressMode.NO
         else:
             compress_mode = compress
-        return self.cnt.pack_all_loose(compress_mode.value)
+        return self.cnt.pack_all_loose(compress_mode.value, validate_objects)
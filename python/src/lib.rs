@@ -1,6 +1,6 @@
 use std::{
     collections::HashMap,
-    io::{Cursor, Read, Seek},
+    io::{Read, Seek},
     path::PathBuf,
     str::FromStr,
 };
@@ -8,19 +8,22 @@ use std::{
 use pyo3::{
     exceptions::{PyRuntimeError, PyValueError},
     prelude::*,
-    types::PyBytes,
+    types::{PyByteArray, PyBytes, PyMemoryView, PySlice},
 };
 use pyo3_file::PyFileLikeObject;
 use rsdos::{
-    container::{Compression, PACKS_DB},
-    db,
-    io::{ByteString, ReaderMaker},
+    container::{traverse_loose, Compression, ObjectsLayout, PACKS_DB},
+    db::{self, Durability},
+    io::{guess_content_format, MaybeContentFormat, ReaderMaker},
+    io_packs::{PObject, PObjectReader, PackIndex},
     Config, Container,
 };
 
 #[pyclass(name = "_Container")]
 struct PyContainer {
     inner: Container,
+    // loaded on demand by ``load_packs_index`` for containers that are mostly read
+    packs_index: Option<PackIndex>,
 }
 
 #[pymethods]
@@ -29,6 +32,7 @@ impl PyContainer {
     fn new(folder: PathBuf) -> Self {
         Self {
             inner: Container::new(folder),
+            packs_index: None,
         }
     }
 
@@ -39,14 +43,35 @@ impl PyContainer {
         Ok(())
     }
 
+    // Remove all packed objects but keep the DB and loose objects, see ``maintain::clear_packs``.
+    // The loaded packs index points to the removed packs, so it is dropped as well.
+    fn _clear_packs(&mut self) -> PyResult<()> {
+        self.packs_index = None;
+        rsdos::maintain::clear_packs(&self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
+    }
+
     fn get_folder(&self) -> PathBuf {
         self.inner.path.clone()
     }
 
-    #[pyo3(signature = (pack_size_target=4 * 1024 * 1024, compression_algorithm="zlib:+1"))]
-    fn init_container(&self, pack_size_target: u64, compression_algorithm: &str) -> PyResult<()> {
+    // ``durability`` is not stored in the config, it only applies to writes through this object.
+    #[pyo3(signature = (
+        pack_size_target=4 * 1024 * 1024,
+        compression_algorithm="zstd:+1",
+        durability="normal",
+    ))]
+    fn init_container(
+        &mut self,
+        pack_size_target: u64,
+        compression_algorithm: &str,
+        durability: &str,
+    ) -> PyResult<()> {
+        let durability = Durability::from_str(durability)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e.to_string()))?;
         let config = Config::new(pack_size_target, compression_algorithm);
         self.inner.initialize(&config)?;
+        self.inner.durability = durability;
         Ok(())
     }
 
@@ -63,6 +88,43 @@ impl PyContainer {
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
     }
 
+    // Insert python bytes as it is, rather than wrapping it in a file-like object that is then
+    // read back chunk by chunk with calls into python. Python bytes are immutable so the GIL is
+    // released while hashing and writing. Other bytes-like objects (``bytearray``, ``memoryview``)
+    // can be changed by python meanwhile, their content is copied first.
+    fn insert_bytes_to_loose(
+        &self,
+        py: Python,
+        content: &Bound<'_, PyAny>,
+    ) -> PyResult<(u64, String)> {
+        let cnt = &self.inner;
+        let res = if let Ok(content) = content.downcast::<PyBytes>() {
+            let content = content.as_bytes();
+            py.allow_threads(|| rsdos::io_loose::insert(content, cnt))
+        } else {
+            let content: Vec<u8> = match content.downcast::<PyByteArray>() {
+                Ok(content) => content.to_vec(),
+                Err(_) => content.extract()?,
+            };
+            py.allow_threads(|| rsdos::io_loose::insert(content.as_slice(), cnt))
+        };
+        res.map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
+    }
+
+    // Bulk insert to loose store in one call, the container is validated only once for the batch.
+    // Objects are hashed and written in parallel with GIL released, python bytes are immutable
+    // and kept alive by ``sources`` so they are read in place.
+    // Only the hashkeys are returned, one python str per object rather than a tuple with the size.
+    fn insert_many_to_loose(&self, py: Python, sources: Vec<Py<PyBytes>>) -> PyResult<Vec<String>> {
+        let sources = sources.iter().map(|s| s.as_bytes(py)).collect::<Vec<_>>();
+
+        let cnt = &self.inner;
+        let res = py
+            .allow_threads(|| rsdos::io_loose::insert_many_parallel(&sources, cnt))
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        Ok(res.into_iter().map(|(_, hashkey)| hashkey).collect())
+    }
+
     fn insert_to_packs(&self, stream: Py<PyAny>) -> PyResult<(u64, u64, String)> {
         let file_like = PyFileLikeObject::with_requirements(stream, true, false, false, false)?;
         let stream = Stream { fl: file_like };
@@ -71,20 +133,20 @@ impl PyContainer {
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
     }
 
+    // Only the hashkeys are returned, same as ``insert_many_to_loose``.
     fn insert_many_to_packs(
         &self,
         py: Python,
         sources: Vec<Py<PyBytes>>,
         compress_mode: &str,
-    ) -> PyResult<Vec<(u64, u64, String)>> {
-        let sources = sources.iter().map(|s| {
-            let b = s.bind(py);
-            b.as_bytes().to_vec()
-        });
+    ) -> PyResult<Vec<String>> {
+        // python bytes are immutable and kept alive by ``sources``, so they are hashed and
+        // compressed in place rather than copied into a ``Vec`` each
+        let sources = sources.iter().map(|s| s.as_bytes(py));
 
         let compression = match compress_mode {
             "no" | "keep" => Compression::from_str("none").unwrap(),
-            "yes" => {
+            "yes" | "auto" => {
                 let algo = self
                     .inner
                     .config()
@@ -98,43 +160,58 @@ impl PyContainer {
             }
         };
 
-        rsdos::io_packs::_insert_many_internal(sources, &self.inner, &compression)
-            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
+        // hash and compress in parallel with GIL released, only the append to pack is serial
+        let cnt = &self.inner;
+        let res = if compress_mode == "auto" {
+            // only compress the objects that look worth to, tiny ones are stored raw
+            let sources = sources.map(AutoBytes).collect::<Vec<_>>();
+            py.allow_threads(|| {
+                rsdos::io_packs::_insert_many_parallel_internal(&sources, cnt, &compression)
+            })
+        } else {
+            let sources = sources.collect::<Vec<_>>();
+            py.allow_threads(|| {
+                rsdos::io_packs::_insert_many_parallel_internal(&sources, cnt, &compression)
+            })
+        };
+        let res = res.map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        Ok(res.into_iter().map(|(_, _, hashkey)| hashkey).collect())
     }
 
     // This is 2 times fast than write to writer from py world since there is no overhead to cross
-    // boundary for every py object.
-    fn extract_many_from_loose(
+    // boundary for every py object. Contents are returned as python bytes, a ``Vec<u8>`` would be
+    // converted to a list of int.
+    // The files are read in parallel with GIL released, then copied into python bytes.
+    fn extract_many_from_loose<'py>(
         &self,
+        py: Python<'py>,
         hashkeys: Vec<String>,
-    ) -> HashMap<String, Option<ByteString>> {
-        let mut buf = Vec::new();
-        hashkeys
-            .iter()
-            .map(|hashkey| {
-                let content = match rsdos::io_loose::extract(hashkey, &self.inner).unwrap() {
-                    Some(obj) => {
-                        buf.clear();
-                        // XXX: no need of using Cursor should use buffer reader
-                        let mut cursor = Cursor::new(&mut buf);
-                        let mut rdr = obj.make_reader().unwrap();
-
-                        std::io::copy(&mut rdr, &mut cursor).unwrap();
-                        Some(buf.clone())
-                    }
-                    _ => None,
-                };
-                (hashkey.to_owned(), content)
+    ) -> PyResult<HashMap<String, Option<Bound<'py, PyBytes>>>> {
+        let cnt = &self.inner;
+        let (objs, contents) = py
+            .allow_threads(|| -> Result<_, rsdos::Error> {
+                let objs = rsdos::io_loose::extract_many(&hashkeys, cnt)?.collect::<Vec<_>>();
+                let contents = rsdos::io_loose::read_many(&objs)?;
+                Ok((objs, contents))
             })
-            .collect()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+
+        let mut res: HashMap<_, _> = hashkeys.into_iter().map(|h| (h, None)).collect();
+        for (obj, content) in objs.into_iter().zip(contents) {
+            res.insert(obj.id, Some(PyBytes::new_bound(py, &content)));
+        }
+        Ok(res)
     }
 
-    fn pack_all_loose(&self, compress_mode: &str) -> PyResult<()> {
+    #[pyo3(signature = (compress_mode, validate=true))]
+    fn pack_all_loose(&self, py: Python, compress_mode: &str, validate: bool) -> PyResult<()> {
         // NOTE: compress_mode passed to here are: "no", "yes", "keep", "auto".
         // In legacy dos, "keep" is equivelant to "no" when pack from loose.
+        // "auto" is the same as "yes" since whether a loose object is worth to compress is always
+        // guessed from the file (small, already compressed or binary ones are stored raw).
         let compression = match compress_mode {
             "no" | "keep" => Compression::from_str("none").unwrap(),
-            "yes" => {
+            "yes" | "auto" => {
                 let algo = self
                     .inner
                     .config()
@@ -147,30 +224,218 @@ impl PyContainer {
                 todo!()
             }
         };
-        rsdos::maintain::_pack_loose_internal(&self.inner, &compression)
+        let cnt = &self.inner;
+        py.allow_threads(|| rsdos::maintain::_pack_loose_internal(cnt, &compression, validate))
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyException, _>(e.to_string()))
     }
 
-    fn extract_many_from_packs(
+    // Load the packs index in memory, ``extract_{one,many}_from_packs`` then look up hashkeys in
+    // it rather than in SQLite. Objects packed afterwards are still found from SQLite.
+    fn load_packs_index(&mut self) -> PyResult<usize> {
+        let index = PackIndex::load(&self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let n = index.len();
+        self.packs_index = Some(index);
+        Ok(n)
+    }
+
+    // Objects are decompressed in parallel with GIL released, then copied into python bytes.
+    fn extract_many_from_packs<'py>(
         &self,
+        py: Python<'py>,
         hashkeys: Vec<String>,
-    ) -> PyResult<HashMap<String, ByteString>> {
-        let objs = rsdos::io_packs::extract_many(&hashkeys, &self.inner)
+    ) -> PyResult<HashMap<String, Bound<'py, PyBytes>>> {
+        let cnt = &self.inner;
+        let packs_index = self.packs_index.as_ref();
+        let (objs, contents) = py
+            .allow_threads(|| -> Result<_, rsdos::Error> {
+                let objs = match packs_index {
+                    Some(index) => index.extract_many(&hashkeys, cnt)?,
+                    None => rsdos::io_packs::extract_many(&hashkeys, cnt)?.collect::<Vec<_>>(),
+                };
+                let contents = rsdos::io_packs::read_many(&objs)?;
+                Ok((objs, contents))
+            })
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
 
         let res = objs
-            .map(|obj| {
-                let hashkey = &obj.id.clone();
-                let Ok(b) = obj.try_into() else {
-                    panic!("Failed to convert `obj` into bytes.");
-                };
-                (hashkey.to_owned(), b)
-            })
+            .into_iter()
+            .zip(contents)
+            .map(|(obj, content)| (obj.id, PyBytes::new_bound(py, &content)))
             .collect();
-
         Ok(res)
     }
 
+    // The content is read straight into the buffer of the returned python bytes, no intermediate
+    // BytesIO and no per-chunk `write()` call back into the py world. Only the lookup of the
+    // object is done with GIL released, the read needs the python bytes.
+    fn extract_one_from_loose<'py>(
+        &self,
+        py: Python<'py>,
+        hashkey: &str,
+    ) -> PyResult<Option<Bound<'py, PyBytes>>> {
+        let cnt = &self.inner;
+        let Some(obj) = py
+            .allow_threads(|| rsdos::io_loose::extract(hashkey, cnt))
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+        else {
+            return Ok(None);
+        };
+
+        let mut rdr = obj
+            .make_reader()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let size = usize::try_from(obj.expected_size)?;
+        let content = PyBytes::new_bound_with(py, size, |buf| {
+            rdr.read_exact(buf)?;
+            Ok(())
+        })?;
+        Ok(Some(content))
+    }
+
+    // The loaded packs index is used for the lookup when there is one, otherwise (or if the
+    // object is packed after the index is loaded) it is selected from SQLite. The content is
+    // then read with one positional read (no seek) into the python bytes.
+    fn extract_one_from_packs<'py>(
+        &self,
+        py: Python<'py>,
+        hashkey: &str,
+    ) -> PyResult<Option<Bound<'py, PyBytes>>> {
+        let cnt = &self.inner;
+        let packs_index = self.packs_index.as_ref();
+        let Some(obj) = py
+            .allow_threads(|| match packs_index.and_then(|index| index.get(hashkey)) {
+                Some(obj) => Ok(Some(obj)),
+                None => rsdos::io_packs::extract(hashkey, cnt),
+            })
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+        else {
+            return Ok(None);
+        };
+
+        // raw_size is the size after decompress, which is what the reader yields
+        let size = usize::try_from(obj.raw_size)?;
+        let content = PyBytes::new_bound_with(py, size, |buf| {
+            PObjectReader::new()
+                .read_exact(&obj, buf)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
+        })?;
+        Ok(Some(content))
+    }
+
+    // Write the content into a writable buffer given by the caller (which can be reused), return
+    // number of bytes written. Loose is looked up first, then packs through the loaded packs index
+    // if there is one. A ``bytearray`` is read into in place with the GIL held, any other buffer
+    // (e.g. a ``memoryview``) takes one extra copy, see ``read_into_buffer``.
+    fn get_object_content_into(&self, hashkey: &str, buffer: &Bound<'_, PyAny>) -> PyResult<usize> {
+        if let Some(obj) = rsdos::io_loose::extract(hashkey, &self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+        {
+            let size = usize::try_from(obj.expected_size)?;
+            read_into_buffer(buffer, size, |buf| {
+                let mut rdr = obj
+                    .make_reader()
+                    .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+                rdr.read_exact(buf)?;
+                Ok(())
+            })?;
+            return Ok(size);
+        }
+
+        let packs_index = self.packs_index.as_ref();
+        let obj = match packs_index.and_then(|index| index.get(hashkey)) {
+            Some(obj) => Some(obj),
+            None => rsdos::io_packs::extract(hashkey, &self.inner)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?,
+        };
+        let Some(obj) = obj else {
+            return Err(PyValueError::new_err(format!("{hashkey} not found")));
+        };
+        let size = usize::try_from(obj.raw_size)?;
+        read_into_buffer(buffer, size, |buf| {
+            PObjectReader::new()
+                .read_exact(&obj, buf)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))
+        })?;
+        Ok(size)
+    }
+
+    // Same as ``get_object_content_into`` for many objects, their contents are written one after
+    // another into the bytearray so no python bytes is created per object. Return for every
+    // hashkey the ``(offset, size)`` of its content in the buffer, ``None`` if it is not found.
+    // The objects are looked up with GIL released, then read in parallel straight into the
+    // bytearray with the GIL held. Nothing is written if the buffer is too small.
+    fn get_objects_content_into(
+        &self,
+        py: Python,
+        hashkeys: Vec<String>,
+        buffer: &Bound<'_, PyByteArray>,
+    ) -> PyResult<Vec<Option<(usize, usize)>>> {
+        let cnt = &self.inner;
+        let packs_index = self.packs_index.as_ref();
+        let layout = py
+            .allow_threads(|| ObjectsLayout::extract(&hashkeys, cnt, packs_index))
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+
+        // checked with the GIL held, the bytearray can not be resized until the read is done
+        let size = layout.size();
+        if size > buffer.len() {
+            return Err(PyValueError::new_err(format!(
+                "buffer of {} bytes is too small for objects of {size} bytes",
+                buffer.len()
+            )));
+        }
+        // SAFETY: no python code runs while the slice is alive, so it can not be resized
+        let buf = unsafe { buffer.as_bytes_mut() };
+        layout
+            .read_into(&mut buf[..size])
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        Ok(layout.spans().to_vec())
+    }
+
+    // Same as ``extract_one_from_*`` but the content stays in rust and is returned as a
+    // ``BytesReader``, python bytes are only created for what is read from it.
+    fn stream_one_from_loose(&self, hashkey: &str) -> PyResult<Option<BytesReader>> {
+        let Some(obj) = rsdos::io_loose::extract(hashkey, &self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+        else {
+            return Ok(None);
+        };
+
+        let mut rdr = obj
+            .make_reader()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let mut inner = Vec::with_capacity(usize::try_from(obj.expected_size)?);
+        rdr.read_to_end(&mut inner)?;
+        Ok(Some(BytesReader::new(inner)))
+    }
+
+    fn stream_one_from_packs(&self, hashkey: &str) -> PyResult<Option<BytesReader>> {
+        let Some(obj) = rsdos::io_packs::extract(hashkey, &self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+        else {
+            return Ok(None);
+        };
+
+        Ok(Some(BytesReader::lazy(obj)))
+    }
+
+    // One index query (by chunks in ``extract_many``) for all ``hashkeys`` instead of one per
+    // hashkey. Readers are returned in the order of ``hashkeys`` and the content is only read
+    // from the pack when the reader is read.
+    fn stream_many_from_packs(&self, hashkeys: Vec<String>) -> PyResult<Vec<Option<BytesReader>>> {
+        let objs = rsdos::io_packs::extract_many(&hashkeys, &self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?
+            .map(|obj| (obj.id.clone(), obj))
+            .collect::<HashMap<_, _>>();
+
+        let readers = hashkeys
+            .iter()
+            .map(|hashkey| objs.get(hashkey).cloned().map(BytesReader::lazy))
+            .collect();
+        Ok(readers)
+    }
+
     fn write_stream_from_loose(&self, hash: &str, py_filelike: Py<PyAny>) -> PyResult<()> {
         Stream::write_from_loose(&self.inner, hash, py_filelike)
     }
@@ -179,6 +444,42 @@ impl PyContainer {
         Stream::write_from_packs(&self.inner, hash, py_filelike)
     }
 
+    // Return all hashkeys of loose in one go, the hashkey is joined from the prefix folder name
+    // and the file name.
+    fn list_loose(&self) -> PyResult<Vec<String>> {
+        let paths = traverse_loose(&self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let hashkeys = paths
+            .filter_map(|p| {
+                let filename = p.file_name()?.to_str()?;
+                let prefix = p.parent()?.file_name()?.to_str()?;
+                Some(format!("{prefix}{filename}"))
+            })
+            .collect();
+        Ok(hashkeys)
+    }
+
+    // Same as ``list_loose`` but hashkeys are decoded into raw bytes (32 bytes for sha256) in
+    // rust, for callers that would otherwise call ``bytes.fromhex`` on every hashkey.
+    // Files in loose that are not named by hex are skipped.
+    fn list_loose_raw<'py>(&self, py: Python<'py>) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+        let paths = traverse_loose(&self.inner)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let mut hashkey = String::new();
+        let mut raw = Vec::new();
+        let hashkeys = paths
+            .filter_map(|p| {
+                hashkey.clear();
+                hashkey.push_str(p.parent()?.file_name()?.to_str()?);
+                hashkey.push_str(p.file_name()?.to_str()?);
+                raw.resize(hashkey.len() / 2, 0);
+                hex::decode_to_slice(&hashkey, &mut raw).ok()?;
+                Some(PyBytes::new_bound(py, &raw))
+            })
+            .collect();
+        Ok(hashkeys)
+    }
+
     // XXX: combine with get_n_objs and return dicts
     fn get_total_size(&self) -> PyResult<u64> {
         let info = rsdos::cli::stat(&self.inner)?;
@@ -258,6 +559,232 @@ impl ReaderMaker for Stream {
     }
 }
 
+/// Read-only file-like object over the content of one object, the content is held by rust.
+/// A packed object is only read (and decompressed) when it is first accessed.
+#[pyclass]
+struct BytesReader {
+    inner: Vec<u8>,
+    pos: usize,
+    pending: Option<PObject>,
+    closed: bool,
+}
+
+impl BytesReader {
+    fn new(inner: Vec<u8>) -> Self {
+        Self {
+            inner,
+            pos: 0,
+            pending: None,
+            closed: false,
+        }
+    }
+
+    fn lazy(obj: PObject) -> Self {
+        Self {
+            inner: Vec::new(),
+            pos: 0,
+            pending: Some(obj),
+            closed: false,
+        }
+    }
+
+    fn check_open(&self) -> PyResult<()> {
+        if self.closed {
+            return Err(PyValueError::new_err("I/O operation on closed file"));
+        }
+        Ok(())
+    }
+
+    fn load(&mut self) -> PyResult<()> {
+        self.check_open()?;
+        if let Some(obj) = self.pending.take() {
+            self.inner.reserve_exact(usize::try_from(obj.raw_size)?);
+            PObjectReader::new()
+                .read_to_end(&obj, &mut self.inner)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        }
+        Ok(())
+    }
+
+    fn remaining(&mut self) -> PyResult<&[u8]> {
+        self.load()?;
+        Ok(&self.inner[self.pos.min(self.inner.len())..])
+    }
+}
+
+#[pymethods]
+impl BytesReader {
+    #[pyo3(signature = (size=-1))]
+    fn read<'py>(&mut self, py: Python<'py>, size: i64) -> PyResult<Bound<'py, PyBytes>> {
+        let remaining = self.remaining()?;
+        let n = usize::try_from(size).map_or(remaining.len(), |size| size.min(remaining.len()));
+        let content = PyBytes::new_bound(py, &remaining[..n]);
+        self.pos += n;
+        Ok(content)
+    }
+
+    // Any writable buffer is accepted (``io.BufferedReader`` passes a ``memoryview``), see
+    // ``write_into_buffer``.
+    fn readinto(&mut self, buffer: &Bound<'_, PyAny>) -> PyResult<usize> {
+        let remaining = self.remaining()?;
+        let n = write_into_buffer(buffer, remaining)?;
+        self.pos += n;
+        Ok(n)
+    }
+
+    #[pyo3(signature = (offset, whence=0))]
+    fn seek(&mut self, offset: i64, whence: i32) -> PyResult<usize> {
+        self.check_open()?;
+        let base = match whence {
+            0 => 0,
+            1 => self.pos as i64,
+            2 => {
+                self.load()?;
+                self.inner.len() as i64
+            }
+            _ => {
+                return Err(PyValueError::new_err(format!(
+                    "invalid whence ({whence}, should be 0, 1 or 2)"
+                )))
+            }
+        };
+        let pos = usize::try_from(base + offset).map_err(|_| {
+            PyValueError::new_err(format!("negative seek position {}", base + offset))
+        })?;
+        self.pos = pos;
+        Ok(pos)
+    }
+
+    fn tell(&self) -> PyResult<usize> {
+        self.check_open()?;
+        Ok(self.pos)
+    }
+
+    fn readable(&self) -> bool {
+        true
+    }
+
+    fn seekable(&self) -> bool {
+        true
+    }
+
+    // ``closed``, ``close`` and ``flush`` complete the raw IO interface, so it can be wrapped with
+    // ``io.BufferedReader``. The content is dropped when closed.
+    #[getter]
+    fn closed(&self) -> bool {
+        self.closed
+    }
+
+    fn close(&mut self) {
+        self.closed = true;
+        self.inner = Vec::new();
+        self.pending = None;
+    }
+
+    fn flush(&self) -> PyResult<()> {
+        self.check_open()
+    }
+
+    fn __enter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __exit__(
+        &mut self,
+        _exc_type: &Bound<'_, PyAny>,
+        _exc_value: &Bound<'_, PyAny>,
+        _traceback: &Bound<'_, PyAny>,
+    ) -> bool {
+        false
+    }
+}
+
+// Write the start of ``content`` into a writable python buffer, as much as it takes, and return
+// number of bytes written. A ``bytearray`` is written in place. The buffer protocol is not
+// available with abi3, so any other buffer (e.g. a ``memoryview``) is viewed as bytes with a
+// ``memoryview`` cast and the content is assigned to a slice of it.
+fn write_into_buffer(buffer: &Bound<'_, PyAny>, content: &[u8]) -> PyResult<usize> {
+    if let Ok(buffer) = buffer.downcast::<PyByteArray>() {
+        // SAFETY: no python code runs while the slice is alive, so it can not be resized
+        let buf = unsafe { buffer.as_bytes_mut() };
+        let n = content.len().min(buf.len());
+        buf[..n].copy_from_slice(&content[..n]);
+        return Ok(n);
+    }
+
+    let view = byte_view(buffer)?;
+    let n = content.len().min(view.len()?);
+    assign_to_view(&view, &content[..n])?;
+    Ok(n)
+}
+
+// Let ``read`` fill the first ``size`` bytes of a writable python buffer, fails if the buffer is
+// smaller. A ``bytearray`` is read into in place. Any other buffer is read into a temporary and
+// assigned to its byte view, since the buffer protocol is not available with abi3.
+fn read_into_buffer(
+    buffer: &Bound<'_, PyAny>,
+    size: usize,
+    read: impl FnOnce(&mut [u8]) -> PyResult<()>,
+) -> PyResult<()> {
+    let too_small = |buf_len: usize| {
+        PyValueError::new_err(format!(
+            "buffer of {buf_len} bytes is too small for object of {size} bytes"
+        ))
+    };
+
+    if let Ok(buffer) = buffer.downcast::<PyByteArray>() {
+        if size > buffer.len() {
+            return Err(too_small(buffer.len()));
+        }
+        // SAFETY: no python code runs while the slice is alive, so it can not be resized
+        let buf = unsafe { buffer.as_bytes_mut() };
+        return read(&mut buf[..size]);
+    }
+
+    let view = byte_view(buffer)?;
+    let buf_len = view.len()?;
+    if size > buf_len {
+        return Err(too_small(buf_len));
+    }
+    let mut content = vec![0; size];
+    read(&mut content)?;
+    assign_to_view(&view, &content)
+}
+
+// View a python buffer other than ``bytearray`` as a ``memoryview`` of bytes, fails if it does not
+// support the buffer protocol or is not contiguous.
+fn byte_view<'py>(buffer: &Bound<'py, PyAny>) -> PyResult<Bound<'py, PyAny>> {
+    PyMemoryView::from_bound(buffer)?.call_method1("cast", ("B",))
+}
+
+// Assign ``content`` to the start of the byte ``view``, fails if the view is read-only.
+fn assign_to_view(view: &Bound<'_, PyAny>, content: &[u8]) -> PyResult<()> {
+    let py = view.py();
+    let end = isize::try_from(content.len())?;
+    view.set_item(
+        PySlice::new_bound(py, 0, end, 1),
+        PyBytes::new_bound(py, content),
+    )
+}
+
+// Bytes from python for which it is guessed whether worth to compress (``CompressMode.AUTO``),
+// plain bytes are always compressed when compression is on.
+struct AutoBytes<'a>(&'a [u8]);
+
+impl ReaderMaker for AutoBytes<'_> {
+    fn make_reader(&self) -> Result<impl Read, rsdos::Error> {
+        Ok(self.0)
+    }
+
+    fn maybe_content_format(&self) -> Result<MaybeContentFormat, rsdos::Error> {
+        Ok(guess_content_format(self.0.len() as u64, self.0))
+    }
+
+    fn size_hint(&self) -> Option<u64> {
+        Some(self.0.len() as u64)
+    }
+}
+
 #[pyfunction]
 // TODO: remove after https://github.com/PyO3/maturin/issues/368 is resolved
 fn run_cli(_py: Python) -> PyResult<()> {
@@ -273,6 +800,8 @@ fn run_cli(_py: Python) -> PyResult<()> {
 #[pyo3(name = "rsdos")]
 fn pyrsdos(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyContainer>()?;
+    m.add_class::<BytesReader>()?;
     m.add_function(wrap_pyfunction!(run_cli, m)?)?;
+    m.add("EXTRACT_CHUNK_SIZE", rsdos::io_packs::EXTRACT_CHUNK_SIZE)?;
     Ok(())
 }
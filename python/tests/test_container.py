@@ -1,3 +1,6 @@
+import io
+
+import pytest
 from rsdos import Container
 import tempfile
 import os
@@ -12,6 +15,22 @@ def test_initialisation(tmp_path):
     assert container.is_initialised
 
 
+def test_initialisation_durability(tmp_path):
+    """Test that objects of a container with no durability are written and read as usual."""
+    container = Container(tmp_path)
+    container.init_container(durability="none")
+
+    contents = [f"content {i}".encode() for i in range(10)]
+    hashkeys = container.add_objects_to_pack(contents)
+    assert container.get_objects_content(hashkeys) == dict(zip(hashkeys, contents))
+
+    (tmp_path / "unknown").mkdir()
+    container = Container(tmp_path / "unknown")
+    with pytest.raises(ValueError):
+        container.init_container(durability="unknown")
+    assert not container.is_initialised
+
+
 def test_add_loose_from_stream(rs_container):
     """Test adding an object from a stream (from an open file, for instance)."""
     # Write 1_000_000 bytes, which larger than a chunk
@@ -28,3 +47,181 @@ def test_add_loose_from_stream(rs_container):
     assert read_content == content
 
     os.remove(temp_handle.name)
+
+
+def test_get_object_content_into(rs_container):
+    """Test reading objects from loose and packs into a reused buffer."""
+    loose_content = b"0123456789" * 100
+    packs_content = b"9876543210" * 10
+    loose_hashkey = rs_container.add_object(loose_content)
+    (packs_hashkey,) = rs_container.add_objects_to_pack([packs_content])
+
+    buffer = bytearray(len(loose_content))
+    n = rs_container.get_object_content_into(loose_hashkey, buffer)
+    assert buffer[:n] == loose_content
+
+    n = rs_container.get_object_content_into(packs_hashkey, buffer)
+    assert buffer[:n] == packs_content
+
+    with pytest.raises(ValueError):
+        rs_container.get_object_content_into(loose_hashkey, bytearray(1))
+
+    buffer = bytearray(len(loose_content) + 10)
+    n = rs_container.get_object_content_into(packs_hashkey, memoryview(buffer)[10:])
+    assert buffer[10 : 10 + n] == packs_content
+
+    with pytest.raises(ValueError):
+        rs_container.get_object_content_into(loose_hashkey, memoryview(buffer)[:1])
+
+
+def test_get_objects_content_into(rs_container):
+    """Test reading many objects from loose and packs into one buffer."""
+    loose_content = b"0123456789" * 100
+    packs_content = b"9876543210" * 10
+    loose_hashkey = rs_container.add_object(loose_content)
+    (packs_hashkey,) = rs_container.add_objects_to_pack([packs_content])
+
+    buffer = bytearray(len(loose_content) + len(packs_content))
+    spans = rs_container.get_objects_content_into(
+        [packs_hashkey, "0" * 64, loose_hashkey], buffer
+    )
+    packs_span, missing_span, loose_span = spans
+    assert packs_span == (0, len(packs_content))
+    assert missing_span is None
+    assert loose_span == (len(packs_content), len(loose_content))
+    assert buffer[: len(packs_content)] == packs_content
+    assert buffer[len(packs_content) :] == loose_content
+
+    with pytest.raises(ValueError):
+        rs_container.get_objects_content_into([loose_hashkey], bytearray(1))
+
+
+def test_add_objects(rs_container):
+    """Test adding a batch of objects to the loose store."""
+    content_list = [f"content {i}".encode() for i in range(10)] + [b"content 0"]
+    hashkeys = rs_container.add_objects(content_list)
+
+    assert len(hashkeys) == len(content_list)
+    assert hashkeys[0] == hashkeys[-1]
+    assert rs_container.count_objects() == 10
+    for hashkey, content in zip(hashkeys, content_list):
+        assert rs_container.get_object_content(hashkey) == content
+
+
+def test_iter_objects_stream(rs_container):
+    """Test the streams from loose and packs are file-like."""
+    loose_content = b"0123456789" * 100
+    packs_content = b"9876543210" * 10
+    loose_hashkey = rs_container.add_object(loose_content)
+    (packs_hashkey,) = rs_container.add_objects_to_pack([packs_content])
+
+    ((_, stream),) = rs_container.iter_objects_stream_loose([loose_hashkey])
+    assert stream.read(10) == loose_content[:10]
+    assert stream.tell() == 10
+    assert stream.read() == loose_content[10:]
+    assert stream.read() == b""
+
+    ((_, stream),) = rs_container.iter_objects_stream_packs([packs_hashkey])
+    with stream:
+        stream.seek(-10, 2)
+        buffer = bytearray(20)
+        assert stream.readinto(buffer) == 10
+        assert buffer[:10] == packs_content[-10:]
+        stream.seek(0)
+        assert stream.read() == packs_content
+
+
+def test_iter_objects_stream_buffered(rs_container):
+    """Test the streams can be wrapped in ``io.BufferedReader`` and read into a memoryview."""
+    loose_content = b"0123456789" * 100
+    packs_content = b"9876543210" * 10
+    loose_hashkey = rs_container.add_object(loose_content)
+    (packs_hashkey,) = rs_container.add_objects_to_pack([packs_content])
+
+    ((_, stream),) = rs_container.iter_objects_stream_loose([loose_hashkey])
+    with io.BufferedReader(stream, buffer_size=64) as reader:
+        assert reader.read(10) == loose_content[:10]
+        assert reader.read() == loose_content[10:]
+    assert stream.closed
+
+    ((_, stream),) = rs_container.iter_objects_stream_packs([packs_hashkey])
+    buffer = bytearray(20)
+    assert stream.readinto(memoryview(buffer)[5:15]) == 10
+    assert buffer[5:15] == packs_content[:10]
+    assert stream.readinto(memoryview(buffer)) == 20
+    assert buffer == packs_content[10:30]
+    stream.close()
+    with pytest.raises(ValueError):
+        stream.read()
+
+def test_iter_objects_stream_packs_many(rs_container):
+    """Test streaming many objects from packs keeps the order, duplicates and missing ones."""
+    contents = [f"content {i}".encode() for i in range(10)]
+    hashkeys = rs_container.add_objects_to_pack(contents)
+    missing = "0" * 64
+
+    requested = hashkeys + [hashkeys[0], missing]
+    results = list(rs_container.iter_objects_stream_packs(requested))
+
+    assert [k for k, _ in results] == requested
+    for (_, stream), content in zip(results, contents + [contents[0]]):
+        assert stream.read() == content
+    assert results[-1][1] is None
+
+    with pytest.raises(ValueError):
+        list(rs_container.iter_objects_stream_packs([missing], skip_if_missing=False))
+
+
+def test_iter_objects_stream_packs_generator(rs_container):
+    """Test streaming from packs takes a generator of hashkeys spanning several chunks."""
+    from rsdos import EXTRACT_CHUNK_SIZE
+
+    contents = [f"content {i}".encode() for i in range(EXTRACT_CHUNK_SIZE + 10)]
+    hashkeys = rs_container.add_objects_to_pack(contents)
+
+    results = list(rs_container.iter_objects_stream_packs(k for k in hashkeys))
+    assert len(results) == len(hashkeys)
+    for (hashkey, stream), expected, content in zip(results, hashkeys, contents):
+        assert hashkey == expected
+        assert stream.read() == content
+
+
+def test_list_all_objects_raw(rs_container):
+    """Test listing loose hashkeys as raw bytes."""
+    hashkeys = rs_container.add_objects([f"content {i}".encode() for i in range(10)])
+
+    raw = rs_container.list_all_objects_raw()
+    assert sorted(raw) == sorted(bytes.fromhex(k) for k in hashkeys)
+
+
+def test_load_packs_index(rs_container):
+    """Test reading packed objects through the in memory packs index."""
+    contents = [f"content {i}".encode() for i in range(10)]
+    hashkeys = rs_container.add_objects_to_pack(contents)
+
+    assert rs_container.load_packs_index() == 10
+
+    # packed after the index is loaded
+    (new_hashkey,) = rs_container.add_objects_to_pack([b"new content"])
+
+    results = rs_container.get_objects_content(hashkeys + [new_hashkey])
+    assert results == dict(zip(hashkeys + [new_hashkey], contents + [b"new content"]))
+
+    assert rs_container.get_object_content(hashkeys[3]) == contents[3]
+    assert rs_container.get_object_content(new_hashkey) == b"new content"
+
+    buffer = bytearray(20)
+    n = rs_container.get_object_content_into(hashkeys[3], buffer)
+    assert buffer[:n] == contents[3]
+    n = rs_container.get_object_content_into(new_hashkey, buffer)
+    assert buffer[:n] == b"new content"
+
+
+def test_clear_packs_drops_packs_index(rs_container):
+    """Test the loaded packs index is not used after the packs are cleared."""
+    (hashkey,) = rs_container.add_objects_to_pack([b"content"])
+    rs_container.load_packs_index()
+
+    rs_container._clear_packs()
+
+    assert rs_container.get_object_content(hashkey) is None
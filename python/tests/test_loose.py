@@ -13,6 +13,16 @@ def test_write_single(rs_container):
     assert hashkey == expected_hashkey
 
 
+def test_write_single_bytes_like(rs_container):
+    """test write 1 object given as bytearray or memoryview to container in loose form"""
+    content = str("test").encode("ascii")
+    expected_hashkey = hashlib.sha256(content).hexdigest()
+
+    assert rs_container.add_object(bytearray(content)) == expected_hashkey
+    assert rs_container.add_object(memoryview(content)) == expected_hashkey
+    assert rs_container.get_object_content(expected_hashkey) == content
+
+
 def test_read_single(rs_container):
     """Add 1 objects to the container in loose form, and test read"""
     content = str(5).encode("ascii")
@@ -10,6 +10,8 @@ from rsdos import Container, CompressMode
         (CompressMode.NO, 5 * 1024),
         (CompressMode.YES, 5),
         (CompressMode.NO, 5),
+        (CompressMode.AUTO, 5 * 1024),
+        (CompressMode.AUTO, 5),
     ],
 )
 def test_pack_loose_10(tmp_path, compress_mode, nrepeat):
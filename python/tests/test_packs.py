@@ -29,7 +29,7 @@ def test_packs_read_single(tmp_path, compress_mode):
 
 @pytest.mark.parametrize(
     "compress_mode",
-    [CompressMode.YES, CompressMode.NO],
+    [CompressMode.YES, CompressMode.NO, CompressMode.AUTO],
 )
 def test_packs_read_many(tmp_path, compress_mode):
     """Add 10'00 objects to the container in loose form, and benchmark write and read speed."""
@@ -98,6 +98,8 @@ def test_packs_write_many(tmp_path, compress_mode):
         (CompressMode.NO, 5 * 1024),
         (CompressMode.YES, 5),
         (CompressMode.NO, 5),
+        (CompressMode.AUTO, 5 * 1024),
+        (CompressMode.AUTO, 5),
     ],
 )
 def test_packs_write_different_size(tmp_path, compress_mode, nrepeat):
@@ -22,7 +22,7 @@ use std::{env, fmt::Debug};
 
 use std::io::{self, Write};
 
-pub const DEFAULT_COMPRESSION_ALGORITHM: &str = "zstd:-1";
+pub const DEFAULT_COMPRESSION_ALGORITHM: &str = "zstd:+1";
 
 #[derive(Parser, Debug)]
 #[command(version, about, long_about = None)]
@@ -399,7 +399,7 @@ pub fn run_cli(args: &[OsString]) -> anyhow::Result<()> {
                         Compression::from_str(DEFAULT_COMPRESSION_ALGORITHM)?
                     };
 
-                    crate::maintain::_pack_loose_internal(cnt, &compression).unwrap_or_else(
+                    crate::maintain::_pack_loose_internal(cnt, &compression, true).unwrap_or_else(
                         |err| {
                             eprintln!("failed on pack loose {err}");
                             std::process::exit(1);
@@ -1,10 +1,14 @@
 use anyhow::Context;
 use serde_json::to_string_pretty;
 
+use crate::db::Durability;
+use crate::io_loose::{self, LObject};
+use crate::io_packs::{self, PObject, PackIndex};
 use crate::Error;
 use crate::{config::Config, db, utils::Dir};
 use core::panic;
 use indicatif::{ProgressBar, ProgressIterator};
+use std::collections::HashMap;
 use std::result;
 use std::str::FromStr;
 use std::time::Duration;
@@ -24,6 +28,9 @@ const SANDBOX: &str = "sandbox";
 #[derive(Debug)]
 pub struct Container {
     pub path: PathBuf,
+    /// Used when writing to the packs DB, it is not stored in the config so every process
+    /// opening the container chooses its own.
+    pub durability: Durability,
 }
 
 #[derive(Debug)]
@@ -85,7 +92,7 @@ impl FromStr for Compression {
         );
         match algo {
             "zlib" => Ok(Compression::Zlib(level as u32)),
-            "zstd" => Ok(Compression::Zstd(level)), // NOTE: should not exposed before v2
+            "zstd" => Ok(Compression::Zstd(level)),
             _ => Err(Error::ParseCompressionError { s: s.to_string() }),
         }
     }
@@ -95,6 +102,7 @@ impl Container {
     pub fn new<P: AsRef<Path>>(path: P) -> Container {
         Container {
             path: path.as_ref().to_owned(),
+            durability: Durability::default(),
         }
     }
 
@@ -274,6 +282,135 @@ pub fn traverse_packs(cnt: &Container) -> Result<impl Iterator<Item = PathBuf>,
         .progress_with(spinnner))
 }
 
+/// The objects of some hashkeys laid out one after another, in the order of the hashkeys, to be
+/// read into one buffer of ``size`` bytes. A hashkey is looked up in loose first, then in packs.
+pub struct ObjectsLayout {
+    spans: Vec<Option<(usize, usize)>>,
+    size: usize,
+    // the objects and the index of their (first) hashkey
+    loose: Vec<LObject>,
+    loose_at: Vec<usize>,
+    packed: Vec<PObject>,
+    packed_at: Vec<usize>,
+}
+
+impl ObjectsLayout {
+    /// Look up the objects of ``hashkeys``, packed objects in ``packs_index`` if it is given (the
+    /// ones not in it are still queried from the DB).
+    pub fn extract(
+        hashkeys: &[String],
+        cnt: &Container,
+        packs_index: Option<&PackIndex>,
+    ) -> Result<Self, Error> {
+        let mut loose: HashMap<_, _> = io_loose::extract_many(hashkeys, cnt)?
+            .map(|obj| (obj.id.clone(), obj))
+            .collect();
+        // what not found in loose, try to find in packs
+        let rest: Vec<_> = hashkeys
+            .iter()
+            .filter(|hashkey| !loose.contains_key(*hashkey))
+            .cloned()
+            .collect();
+        let packed = match packs_index {
+            Some(index) => index.extract_many(&rest, cnt)?,
+            None => io_packs::extract_many(rest, cnt)?.collect(),
+        };
+        let mut packed: HashMap<_, _> = packed
+            .into_iter()
+            .map(|obj| (obj.id.clone(), obj))
+            .collect();
+
+        let mut layout = Self {
+            spans: Vec::with_capacity(hashkeys.len()),
+            size: 0,
+            loose: Vec::with_capacity(loose.len()),
+            loose_at: Vec::with_capacity(loose.len()),
+            packed: Vec::with_capacity(packed.len()),
+            packed_at: Vec::with_capacity(packed.len()),
+        };
+        // a hashkey given more than once is laid out (and read) once, the content is the same
+        let mut seen: HashMap<&str, Option<(usize, usize)>> = HashMap::new();
+        for (i, hashkey) in hashkeys.iter().enumerate() {
+            if let Some(span) = seen.get(hashkey.as_str()) {
+                layout.spans.push(*span);
+                continue;
+            }
+            let size = if let Some(obj) = loose.remove(hashkey) {
+                let size = obj.expected_size;
+                layout.loose.push(obj);
+                layout.loose_at.push(i);
+                Some(size)
+            } else if let Some(obj) = packed.remove(hashkey) {
+                let size = obj.raw_size;
+                layout.packed.push(obj);
+                layout.packed_at.push(i);
+                Some(size)
+            } else {
+                None
+            };
+            // a size that does not fit is caught by the size check when the object is read
+            let span = size.map(|size| {
+                let size = usize::try_from(size).unwrap_or_default();
+                let span = (layout.size, size);
+                layout.size += size;
+                span
+            });
+            seen.insert(hashkey.as_str(), span);
+            layout.spans.push(span);
+        }
+        Ok(layout)
+    }
+
+    /// For every hashkey the ``(offset, size)`` of its content in the buffer, ``None`` if it is
+    /// not found.
+    #[must_use]
+    pub fn spans(&self) -> &[Option<(usize, usize)>] {
+        &self.spans
+    }
+
+    /// Size of the buffer the contents are read into.
+    #[must_use]
+    pub fn size(&self) -> usize {
+        self.size
+    }
+
+    /// Read the contents straight into ``buf`` of ``size`` bytes. Loose and packed objects are
+    /// read in parallel, see ``io_loose::read_many_into`` and ``io_packs::read_many_into``.
+    pub fn read_into(&self, buf: &mut [u8]) -> Result<(), Error> {
+        if buf.len() != self.size {
+            return Err(Error::UnexpectedCopySize {
+                expected: self.size as u64,
+                got: buf.len() as u64,
+            });
+        }
+
+        // the buffer of every object, at the index of its hashkey
+        let mut outs: Vec<Option<&mut [u8]>> = Vec::new();
+        outs.resize_with(self.spans.len(), || None);
+        let mut objs_at = [&self.loose_at[..], &self.packed_at[..]].concat();
+        // the objects are laid out in the order of their hashkeys
+        objs_at.sort_unstable();
+        let mut rest = buf;
+        for i in objs_at {
+            let (_, size) = self.spans[i].expect("a found object has a span");
+            let (out, tail) = std::mem::take(&mut rest).split_at_mut(size);
+            outs[i] = Some(out);
+            rest = tail;
+        }
+
+        let mut take_outs = |at: &[usize]| {
+            at.iter()
+                .map(|&i| outs[i].take().expect("a found object has its buffer"))
+                .collect::<Vec<_>>()
+        };
+        let loose_outs = take_outs(&self.loose_at);
+        let packed_outs = take_outs(&self.packed_at);
+
+        io_loose::read_many_into(&self.loose, loose_outs)?;
+        io_packs::read_many_into(&self.packed, packed_outs)
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use tempfile::tempdir;
@@ -356,4 +493,33 @@ mod tests {
         // unable to parse
         assert!(Compression::from_str("zzzz").is_err());
     }
+
+    #[test]
+    fn objects_layout_read_into() {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, "zlib+1");
+
+        let (_, loose_hashkey) = io_loose::insert(b"loose content".to_vec(), &cnt).unwrap();
+        let (_, _, packs_hashkey) = io_packs::insert(b"packs content ".repeat(100), &cnt).unwrap();
+        let missing = "0".repeat(64);
+        let hashkeys = vec![packs_hashkey.clone(), missing, loose_hashkey, packs_hashkey];
+
+        let layout = ObjectsLayout::extract(&hashkeys, &cnt, None).unwrap();
+        let packs_size = b"packs content ".len() * 100;
+        assert_eq!(
+            layout.spans(),
+            &[
+                Some((0, packs_size)),
+                None,
+                Some((packs_size, 13)),
+                Some((0, packs_size))
+            ]
+        );
+
+        let mut buf = vec![0u8; layout.size()];
+        layout.read_into(&mut buf).unwrap();
+        assert_eq!(&buf[..packs_size], b"packs content ".repeat(100).as_slice());
+        assert_eq!(&buf[packs_size..], b"loose content");
+
+        assert!(layout.read_into(&mut [0u8; 1]).is_err());
+    }
 }
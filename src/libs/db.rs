@@ -1,9 +1,37 @@
 use anyhow::Context;
 use rusqlite::{params, Connection, OptionalExtension};
-use std::{path::PathBuf, u64};
+use std::{
+    path::{Path, PathBuf},
+    str::FromStr,
+    u64,
+};
 
 use crate::Error;
 
+/// How hard the objects written to the packs DB are synced to disk, it is the ``synchronous``
+/// pragma of the connection writing to the DB. ``None`` never waits for the disk and is only meant
+/// for throwaway containers (e.g. in benchmarks), the DB can be corrupted if the OS crashes.
+#[derive(Debug, Clone, Copy, Default, PartialEq)]
+pub enum Durability {
+    None,
+    #[default]
+    Normal,
+    Full,
+}
+
+impl FromStr for Durability {
+    type Err = Error;
+
+    fn from_str(s: &str) -> Result<Self, Self::Err> {
+        match s.trim() {
+            "none" => Ok(Durability::None),
+            "normal" => Ok(Durability::Normal),
+            "full" => Ok(Durability::Full),
+            _ => Err(Error::ParseDurabilityError { s: s.to_string() }),
+        }
+    }
+}
+
 pub fn create(db: &PathBuf) -> anyhow::Result<()> {
     // Create the table if it doesn't already exist
     let conn = Connection::open(db).with_context(|| "create db")?;
@@ -31,6 +59,23 @@ pub fn create(db: &PathBuf) -> anyhow::Result<()> {
     Ok(())
 }
 
+/// Open the packs DB for writing objects. The DB is in WAL mode (see ``create``) where
+/// ``synchronous = NORMAL`` (the default ``durability``) is enough to keep it consistent, a commit
+/// then does not wait for an fsync, only checkpoints do.
+pub fn open_for_write(db: &Path, durability: Durability) -> Result<Connection, Error> {
+    let conn = Connection::open(db)?;
+    let synchronous = match durability {
+        Durability::None => "OFF",
+        Durability::Normal => "NORMAL",
+        Durability::Full => "FULL",
+    };
+    conn.pragma_update(None, "synchronous", synchronous)?;
+    if durability == Durability::None {
+        conn.pragma_update(None, "temp_store", "MEMORY")?;
+    }
+    Ok(conn)
+}
+
 pub fn print_table(db: &PathBuf) -> anyhow::Result<()> {
     // Open the database connection
     let conn = Connection::open(db)
@@ -148,3 +193,26 @@ pub fn select(conn: &Connection, hash_hex: &str) -> Result<Option<PackEntry>, Er
 
     Ok(entry)
 }
+
+/// Select all entries of the packs index, in no specific order.
+pub fn select_all(conn: &Connection) -> Result<Vec<PackEntry>, Error> {
+    let mut stmt = conn
+        .prepare("SELECT hashkey, compressed, size, offset, length, pack_id FROM db_object")
+        .map_err(|err| Error::SQLiteSelectError { source: err })?;
+    let entries = stmt
+        .query_map([], |row| {
+            Ok(PackEntry {
+                hashkey: row.get(0)?,
+                compressed: row.get(1)?,
+                raw_size: row.get(2)?,
+                offset: row.get(3)?,
+                size: row.get(4)?,
+                pack_id: row.get(5)?,
+            })
+        })
+        .map_err(|err| Error::SQLiteSelectError { source: err })?
+        .collect::<Result<Vec<_>, _>>()
+        .map_err(|err| Error::SQLiteSelectError { source: err })?;
+
+    Ok(entries)
+}
@@ -37,6 +37,8 @@ pub enum Error {
     StoreComponentError { path: PathBuf, cause: String },
     #[error("Could not parst {} to compression algorithm", .s)]
     ParseCompressionError { s: String },
+    #[error("Could not parse {} to durability, expect one of none, normal and full", .s)]
+    ParseDurabilityError { s: String },
 
     // io module errors
     #[error("Unexpected size in copy: expect {} got {}", .expected, .got)]
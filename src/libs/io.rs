@@ -2,7 +2,7 @@ use crate::Error;
 use bytes::Buf;
 use ring::digest::{Algorithm, Context, Digest};
 use std::fs;
-use std::io::{self, Read, Seek, SeekFrom, Write};
+use std::io::{self, Read, Write};
 use std::path::PathBuf;
 
 pub trait Finishable: Write {
@@ -16,6 +16,9 @@ impl<W: Write> Finishable for W {
     }
 }
 
+/// ``HashWriter`` hash the content while it is written, so hashing and compressing share the same
+/// pass over the buffer. The digest is from ``ring`` which pick the CPU SHA extensions (SHA-NI
+/// on x86_64, the crypto extension on aarch64) at runtime when available.
 pub struct HashWriter<W>
 where
     W: Finishable,
@@ -36,7 +39,7 @@ where
     pub fn finish(mut self) -> Digest {
         let _ = self.writer.flush();
         let _ = self.writer.finish();
-        self.ctx.clone().finish()
+        self.ctx.finish()
     }
 }
 
@@ -58,6 +61,31 @@ where
     }
 }
 
+/// Lowercase hex of ``digest``. A digest up to 32 bytes (sha256) is encoded in one pass into a
+/// stack buffer, instead of pushing the hex chars one by one to the string.
+#[must_use]
+pub fn hex_digest<T: AsRef<[u8]>>(digest: T) -> String {
+    let digest = digest.as_ref();
+    let mut buf = [0u8; 64];
+    match buf.get_mut(..digest.len() * 2) {
+        Some(out) => {
+            hex::encode_to_slice(digest, out).expect("out is twice as long as the digest");
+            String::from_utf8(out.to_vec()).expect("hex chars are ASCII")
+        }
+        None => hex::encode(digest),
+    }
+}
+
+/// Buffer size for ``copy_by_chunk`` of a content of ``size_hint`` bytes with chunks of at most
+/// ``chunk_size``, so a small content does not allocate (and zero) a buffer for large files.
+/// A wrong hint is harmless, the copy then takes more or fewer reads.
+#[must_use]
+pub fn chunk_size_for(size_hint: Option<u64>, chunk_size: usize) -> usize {
+    size_hint
+        .and_then(|n| usize::try_from(n).ok())
+        .map_or(chunk_size, |n| n.clamp(1, chunk_size))
+}
+
 /// Copy by chunk (``chunk_size`` in unit bytes) and return a tuple of total bytes read from reader
 /// and total bytes write to writer.
 pub fn copy_by_chunk<R, W>(
@@ -104,6 +132,30 @@ pub trait ReaderMaker {
     fn maybe_content_format(&self) -> Result<MaybeContentFormat, Error> {
         Ok(MaybeContentFormat::MaybeLargeText)
     }
+
+    /// The hash of the content if it is known without reading it (e.g. a loose object is named by
+    /// its hash). ``None`` means the hash has to be computed while the content is written.
+    fn expected_hash(&self) -> Option<String> {
+        None
+    }
+
+    /// The size of the content if it is known without reading it, ``None`` if not (e.g. a stream).
+    /// It is only a hint for the size of the copy buffer, see ``chunk_size_for``.
+    fn size_hint(&self) -> Option<u64> {
+        None
+    }
+
+    /// Same as ``make_reader``, with the size of the content: ``size_hint`` or, if it is not known
+    /// up front, the size of the opened source (e.g. from the metadata of the opened file).
+    fn make_sized_reader(&self) -> Result<(impl Read, Option<u64>), Error> {
+        Ok((self.make_reader()?, self.size_hint()))
+    }
+
+    /// Same as ``maybe_content_format`` for a source whose ``content`` is already read, so that
+    /// guessing from the content does not read the source once more.
+    fn maybe_content_format_of(&self, _content: &[u8]) -> Result<MaybeContentFormat, Error> {
+        self.maybe_content_format()
+    }
 }
 
 impl ReaderMaker for PathBuf {
@@ -123,29 +175,47 @@ impl ReaderMaker for PathBuf {
     /// XXX: rename to maybe_text_format, content is a bit vague
     fn maybe_content_format(&self) -> Result<MaybeContentFormat, Error> {
         let mut f = fs::OpenOptions::new().read(true).open(self)?;
-        if f.metadata().unwrap().len() <= 850 {
+        let size = f.metadata()?.len();
+        if size <= SMALL_CONTENT_SIZE {
             return Ok(MaybeContentFormat::SmallContent);
         }
 
-        // if it is zlib/zstd
-        let mut buf = [0u8; 4];
+        // the file is larger than 512 bytes, read the header once for all the checks
+        let mut buf = [0u8; 512];
         f.read_exact(&mut buf)?;
 
-        if buf[0] == 0x78 || buf == [0x28, 0xB5, 0x2F, 0xFD] {
-            return Ok(MaybeContentFormat::ZFile(buf));
-        }
+        Ok(guess_content_format(size, &buf))
+    }
 
-        let mut buf = [0u8; 512];
-        f.seek(SeekFrom::Start(0))?;
-        f.read_exact(&mut buf)?;
+    fn maybe_content_format_of(&self, content: &[u8]) -> Result<MaybeContentFormat, Error> {
+        Ok(guess_content_format(content.len() as u64, content))
+    }
+}
 
-        // if find any null bytes then it is maybe binary
-        if buf.contains(&0x00) {
-            return Ok(MaybeContentFormat::MaybeBinary);
+/// Content not larger than this (in bytes) is never worth to compress.
+pub const SMALL_CONTENT_SIZE: u64 = 850;
+
+/// Guess whether content is worth to compress from its ``size`` and its first bytes ``header``
+/// (only the first 512 bytes are looked at), see ``maybe_content_format`` of ``PathBuf`` for the
+/// decision making flow.
+pub fn guess_content_format(size: u64, header: &[u8]) -> MaybeContentFormat {
+    if size <= SMALL_CONTENT_SIZE {
+        return MaybeContentFormat::SmallContent;
+    }
+
+    // if it is zlib/zstd
+    if let Some(buf) = header.first_chunk::<4>() {
+        if buf[0] == 0x78 || *buf == [0x28, 0xB5, 0x2F, 0xFD] {
+            return MaybeContentFormat::ZFile(*buf);
         }
+    }
 
-        Ok(MaybeContentFormat::MaybeLargeText)
+    // if find any null bytes then it is maybe binary
+    if header[..header.len().min(512)].contains(&0x00) {
+        return MaybeContentFormat::MaybeBinary;
     }
+
+    MaybeContentFormat::MaybeLargeText
 }
 
 pub type ByteStr = [u8];
@@ -155,6 +225,20 @@ impl ReaderMaker for ByteString {
     fn make_reader(&self) -> Result<impl Read, Error> {
         Ok(self.reader())
     }
+
+    fn size_hint(&self) -> Option<u64> {
+        Some(self.len() as u64)
+    }
+}
+
+impl ReaderMaker for &ByteStr {
+    fn make_reader(&self) -> Result<impl Read, Error> {
+        Ok(*self)
+    }
+
+    fn size_hint(&self) -> Option<u64> {
+        Some(self.len() as u64)
+    }
 }
 
 #[cfg(test)]
@@ -165,6 +249,7 @@ mod tests {
     use super::*;
     use flate2::{write::ZlibEncoder, Compression};
     use rand;
+    use ring::digest;
 
     #[test]
     fn io_maybe_content_format_guess() {
@@ -261,4 +346,61 @@ mod tests {
 
         f.close().unwrap();
     }
+
+    #[test]
+    fn io_hex_digest() {
+        let hash = digest::digest(&digest::SHA256, b"test 0");
+        assert_eq!(hex_digest(hash), hex::encode(hash));
+        assert_eq!(hex_digest([0x01u8, 0xab]), "01ab");
+        assert_eq!(hex_digest([0u8; 0]), "");
+
+        // longer than the stack buffer
+        let long = [0xffu8; 48];
+        assert_eq!(hex_digest(long), "ff".repeat(48));
+    }
+
+    #[test]
+    fn io_chunk_size_for_hint() {
+        assert_eq!(chunk_size_for(None, 65_536), 65_536);
+        assert_eq!(chunk_size_for(Some(6), 65_536), 6);
+        assert_eq!(chunk_size_for(Some(0), 65_536), 1);
+        assert_eq!(chunk_size_for(Some(1 << 40), 65_536), 65_536);
+
+        // a small buffer still copies all of a content larger than the hint
+        let content = "test 0".repeat(100).into_bytes();
+        let mut buf = Vec::new();
+        let n =
+            copy_by_chunk(&mut &content[..], &mut buf, chunk_size_for(Some(6), 65_536)).unwrap();
+        assert_eq!(n, 600);
+        assert_eq!(buf, content);
+    }
+
+    #[test]
+    fn io_guess_content_format_bytes() {
+        assert_eq!(
+            guess_content_format(6, b"test 0"),
+            MaybeContentFormat::SmallContent
+        );
+
+        let text = "test 0".repeat(200).into_bytes();
+        assert_eq!(
+            guess_content_format(text.len() as u64, &text),
+            MaybeContentFormat::MaybeLargeText
+        );
+
+        let mut binary = text.clone();
+        binary[100] = 0x00;
+        assert_eq!(
+            guess_content_format(binary.len() as u64, &binary),
+            MaybeContentFormat::MaybeBinary
+        );
+
+        // null bytes beyond the 512 bytes header are not looked at
+        let mut text_tail = text.clone();
+        text_tail[1000] = 0x00;
+        assert_eq!(
+            guess_content_format(text_tail.len() as u64, &text_tail),
+            MaybeContentFormat::MaybeLargeText
+        );
+    }
 }
@@ -1,9 +1,13 @@
+use rayon::prelude::*;
 use ring::digest;
 use std::fs;
-use std::io::Read;
+use std::io::{self, Read};
 use std::path::{Path, PathBuf};
 
-use crate::io::{copy_by_chunk, ByteString, HashWriter, ReaderMaker};
+use crate::io::{
+    chunk_size_for, copy_by_chunk, hex_digest, ByteString, HashWriter, MaybeContentFormat,
+    ReaderMaker,
+};
 use crate::Container;
 use crate::Error;
 
@@ -15,7 +19,7 @@ pub struct LObject {
 }
 
 impl LObject {
-    fn new<P: AsRef<Path>>(id: &str, loc: P, expected_size: u64) -> Self {
+    pub(crate) fn new<P: AsRef<Path>>(id: &str, loc: P, expected_size: u64) -> Self {
         Self {
             id: id.to_string(),
             loc: loc.as_ref().to_path_buf(),
@@ -47,6 +51,62 @@ impl ReaderMaker for LObject {
     fn make_reader(&self) -> Result<impl Read, Error> {
         Ok(fs::OpenOptions::new().read(true).open(&self.loc)?)
     }
+
+    fn maybe_content_format(&self) -> Result<MaybeContentFormat, Error> {
+        self.loc.maybe_content_format()
+    }
+
+    fn maybe_content_format_of(&self, content: &[u8]) -> Result<MaybeContentFormat, Error> {
+        self.loc.maybe_content_format_of(content)
+    }
+
+    /// Loose object is stored with its hash as the filename.
+    fn expected_hash(&self) -> Option<String> {
+        Some(self.id.clone())
+    }
+
+    fn size_hint(&self) -> Option<u64> {
+        Some(self.expected_size)
+    }
+}
+
+/// A loose object file to be packed. Unlike ``LObject`` its size is not known up front, it is
+/// taken from the file once it is opened, so the loose folder is traversed without a ``stat`` of
+/// every object.
+pub(crate) struct LooseFile {
+    id: String,
+    loc: PathBuf,
+}
+
+impl LooseFile {
+    pub(crate) fn new(id: String, loc: PathBuf) -> Self {
+        Self { id, loc }
+    }
+}
+
+impl ReaderMaker for LooseFile {
+    fn make_reader(&self) -> Result<impl Read, Error> {
+        Ok(fs::OpenOptions::new().read(true).open(&self.loc)?)
+    }
+
+    fn make_sized_reader(&self) -> Result<(impl Read, Option<u64>), Error> {
+        let f = fs::OpenOptions::new().read(true).open(&self.loc)?;
+        let size = f.metadata()?.len();
+        Ok((f, Some(size)))
+    }
+
+    fn maybe_content_format(&self) -> Result<MaybeContentFormat, Error> {
+        self.loc.maybe_content_format()
+    }
+
+    fn maybe_content_format_of(&self, content: &[u8]) -> Result<MaybeContentFormat, Error> {
+        self.loc.maybe_content_format_of(content)
+    }
+
+    /// Loose object is stored with its hash as the filename.
+    fn expected_hash(&self) -> Option<String> {
+        Some(self.id.clone())
+    }
 }
 
 pub fn insert_many<I>(sources: I, cnt: &Container) -> Result<Vec<(u64, String)>, Error>
@@ -54,7 +114,26 @@ where
     I: IntoIterator,
     I::Item: ReaderMaker,
 {
-    sources.into_iter().map(|s| insert(s, cnt)).collect()
+    // validate the container once for the whole batch instead of once per object, it reads
+    // the container dir every time.
+    cnt.valid()?;
+    sources
+        .into_iter()
+        .map(|s| _insert_internal(&s, cnt))
+        .collect()
+}
+
+/// Same as ``insert_many`` but objects are hashed and written by many threads, each object goes
+/// to its own file so there is nothing to serialize. Results are in the order of ``sources``.
+pub fn insert_many_parallel<T>(sources: &[T], cnt: &Container) -> Result<Vec<(u64, String)>, Error>
+where
+    T: ReaderMaker + Sync,
+{
+    cnt.valid()?;
+    sources
+        .par_iter()
+        .map(|s| _insert_internal(s, cnt))
+        .collect()
 }
 
 pub fn insert<T>(source: T, cnt: &Container) -> Result<(u64, String), Error>
@@ -62,7 +141,14 @@ where
     T: ReaderMaker,
 {
     cnt.valid()?;
+    _insert_internal(&source, cnt)
+}
 
+/// Write one object to loose store, the container is assumed to be already validated.
+fn _insert_internal<T>(source: &T, cnt: &Container) -> Result<(u64, String), Error>
+where
+    T: ReaderMaker,
+{
     // <cnt_path>/sandbox/<uuid> as dst
     let dst = format!("{}.tmp", uuid::Uuid::new_v4());
     let dst = cnt.sandbox().join(dst);
@@ -78,26 +164,49 @@ where
     // NOTE: this chunk_size is the upbound of the buf, which in order to control the size of
     // memory usage when coping large file. 512 KiB is way larger then the default buffer size in rust
     // (4KiB). Large buffer may increase chance of loosing data.
-    let chunk_size = 524_288; // 512 KiB TODO: make it configurable??
-                              //
+    // 512 KiB TODO: make it configurable??
+    let chunk_size = chunk_size_for(source.size_hint(), 524_288);
     let mut stream = source.make_reader()?;
     let bytes_read = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)
         .map_err(|err| Error::ChunkCopyError { source: err })?;
     let hash = hwriter.ctx.finish();
-    let hash_hex = hex::encode(hash);
+    let hash_hex = hex_digest(hash);
 
-    let loose = cnt.loose();
-    fs::create_dir_all(loose.join(format!("{}/", &hash_hex[..2])))?;
-    let loose_dst = loose.join(format!("{}/{}", &hash_hex[..2], &hash_hex[2..]));
+    let loose_dst = cnt
+        .loose()
+        .join(format!("{}/{}", &hash_hex[..2], &hash_hex[2..]));
 
-    // avoid move if duplicate exist to reduce overhead
-    if !loose_dst.exists() {
-        fs::rename(&dst, &loose_dst)?;
+    // avoid move if duplicate exist to reduce overhead, but drop the tmp file so the sandbox
+    // does not grow with every duplicate insert.
+    if loose_dst.exists() {
+        fs::remove_file(&dst)?;
+    } else if let Err(err) = rename_to_loose(&dst, &loose_dst) {
+        // the same object can be written at the same time from another thread, on windows
+        // rename fails if the destination exists.
+        if !loose_dst.exists() {
+            return Err(err.into());
+        }
+        fs::remove_file(&dst)?;
     }
 
     Ok((bytes_read as u64, hash_hex))
 }
 
+/// Move ``src`` to ``loose_dst``, the prefix folder of ``loose_dst`` is only created if the move
+/// fails because it does not exist yet. Objects mostly go to a prefix folder that is already
+/// there, so this saves the syscalls of creating it for every object.
+fn rename_to_loose(src: &Path, loose_dst: &Path) -> io::Result<()> {
+    match fs::rename(src, loose_dst) {
+        Err(err) if err.kind() == io::ErrorKind::NotFound => {
+            if let Some(prefix) = loose_dst.parent() {
+                fs::create_dir_all(prefix)?;
+            }
+            fs::rename(src, loose_dst)
+        }
+        res => res,
+    }
+}
+
 pub fn extract(hashkey: &str, cnt: &Container) -> Result<Option<LObject>, Error> {
     cnt.valid()?;
 
@@ -129,6 +238,48 @@ where
     Ok(iter)
 }
 
+/// Read the content of all ``objs`` in parallel, contents are returned in the order of ``objs``.
+/// Loose objects are independent files, so the reads do not wait on each other.
+/// The number of threads can be controlled with ``RAYON_NUM_THREADS``.
+pub fn read_many(objs: &[LObject]) -> Result<Vec<ByteString>, Error> {
+    objs.par_iter()
+        .map(|obj| {
+            let buf = fs::read(&obj.loc)?;
+            // FIXME: (v2) use CRC32 checksum
+            let n = buf.len() as u64;
+            if n == obj.expected_size {
+                Ok(buf)
+            } else {
+                Err(Error::UnexpectedCopySize {
+                    expected: obj.expected_size,
+                    got: n,
+                })
+            }
+        })
+        .collect()
+}
+
+/// Same as ``read_many`` but the content of ``objs[i]`` is written into ``bufs[i]``, which must be
+/// exactly its ``expected_size`` long, so the contents go straight to memory of the caller.
+///
+/// # Panics
+///
+/// If there is not one buffer for every object.
+pub fn read_many_into(objs: &[LObject], bufs: Vec<&mut [u8]>) -> Result<(), Error> {
+    assert_eq!(objs.len(), bufs.len(), "one buffer for every object");
+    objs.par_iter().zip(bufs).try_for_each(|(obj, buf)| {
+        // FIXME: (v2) use CRC32 checksum
+        if buf.len() as u64 != obj.expected_size {
+            return Err(Error::UnexpectedCopySize {
+                expected: obj.expected_size,
+                got: buf.len() as u64,
+            });
+        }
+        fs::File::open(&obj.loc)?.read_exact(buf)?;
+        Ok(())
+    })
+}
+
 #[cfg(test)]
 mod tests {
     use std::collections::HashMap;
@@ -197,4 +348,74 @@ mod tests {
         }
         assert_eq!(count + 2, hashkeys.len());
     }
+
+    #[test]
+    fn io_loose_read_many() {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, "none");
+
+        let mut hash_content_map: HashMap<String, String> = HashMap::new();
+        for i in 0..100 {
+            let content = format!("test {i}");
+            let buf = content.clone().into_bytes();
+            let (_, hash) = insert(buf, &cnt).unwrap();
+            hash_content_map.insert(hash, content);
+        }
+
+        let objs = extract_many(hash_content_map.keys(), &cnt)
+            .unwrap()
+            .collect::<Vec<_>>();
+        let contents = read_many(&objs).unwrap();
+        assert_eq!(contents.len(), 100);
+        for (obj, content) in objs.iter().zip(contents) {
+            assert_eq!(
+                String::from_utf8(content).unwrap(),
+                hash_content_map.get(&obj.id).unwrap().to_owned()
+            );
+        }
+    }
+
+    #[test]
+    fn io_loose_insert_many_with_duplicates() {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, "none");
+
+        let sources = (0..10)
+            .map(|i| format!("test {}", i % 5).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = insert_many(sources, &cnt).unwrap();
+        assert_eq!(results.len(), 10);
+        assert_eq!(results[0].1, results[5].1);
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.loose, 5);
+
+        // tmp files of duplicates are not left behind in sandbox
+        assert_eq!(fs::read_dir(cnt.sandbox()).unwrap().count(), 0);
+    }
+
+    #[test]
+    fn io_loose_insert_slice() {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, "none");
+
+        let content: &[u8] = b"test 0";
+        let (n, hashkey) = insert(content, &cnt).unwrap();
+        assert_eq!(n, 6);
+        assert_eq!(insert(content.to_vec(), &cnt).unwrap().1, hashkey);
+    }
+
+    #[test]
+    fn io_loose_insert_many_parallel() {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, "none");
+
+        // with duplicates that may be written at the same time
+        let sources = (0..200)
+            .map(|i| format!("test {}", i % 100).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = insert_many_parallel(&sources, &cnt).unwrap();
+        let results_serial = insert_many(sources.clone(), &cnt).unwrap();
+        assert_eq!(results, results_serial);
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.loose, 100);
+        assert_eq!(fs::read_dir(cnt.sandbox()).unwrap().count(), 0);
+    }
 }
@@ -1,22 +1,61 @@
 use flate2;
 use flate2::read::ZlibDecoder;
 use flate2::write::ZlibEncoder;
+use flate2::{Decompress, FlushDecompress};
+use rayon::prelude::*;
 use ring::digest;
 use rusqlite::{params, params_from_iter, Connection};
 use std::fs::{self, File};
-use std::io::{self, Read, Seek, SeekFrom, Take};
+use std::io::{self, BufReader, BufWriter, Read, Seek, SeekFrom, Take, Write};
 use std::path::{Path, PathBuf};
+use std::sync::Arc;
+use zstd::stream::read::Decoder as ZstdDecoder;
 use zstd::stream::write::Encoder as ZstdEncoder;
 
 use crate::container::Compression;
 use crate::db::PackEntry;
-use crate::io::{copy_by_chunk, ByteString, HashWriter, MaybeContentFormat, ReaderMaker};
+use crate::io::{
+    chunk_size_for, copy_by_chunk, hex_digest, ByteString, HashWriter, MaybeContentFormat,
+    ReaderMaker,
+};
 use crate::{db, Container};
 
 use crate::utils::Dir;
 use crate::Error;
 
+// Upper bound of the input buffer of the zlib decoder when reading from packs, 64 KiB
+// as the chunk size used to write into packs.
+const PACK_READ_BUF_SIZE: usize = 65_536;
+
+// Objects stored one after another in a pack are read with a single positional read of up to
+// this size in ``read_many``, instead of one read per (usually small) object, 1 MiB.
+const PACK_READ_RUN_SIZE: u64 = 1_048_576;
+
+// Content smaller than this (in bytes) is stored as is even when compression is on, the zlib/zstd
+// header and checksum alone take ~10 bytes and there is nothing left to save on such content.
+const MIN_COMPRESS_SIZE: u64 = 64;
+
+// A compressed object is a zstd frame if it starts with this magic number, otherwise it is a zlib
+// stream (which starts with 0x78). The compression of an object is not recorded in the packs DB,
+// only that it is compressed, so packs with objects of both algorithms can be read.
+const ZSTD_MAGIC: [u8; 4] = [0x28, 0xB5, 0x2F, 0xFD];
+
+/// Number of hashkeys looked up in one ``IN (...)`` query of the packs DB by ``extract_many``,
+/// kept below the default SQLite limit of 999 host parameters.
+pub const EXTRACT_CHUNK_SIZE: usize = 950;
+
+/// Size of the input buffer for decoding a packed object of ``size`` bytes, never larger than the
+/// object itself so reading many small objects does not allocate a full size buffer for each.
+fn pack_read_buf_size(size: u64) -> usize {
+    usize::try_from(size).map_or(PACK_READ_BUF_SIZE, |n| n.clamp(1, PACK_READ_BUF_SIZE))
+}
+
+fn pack_read_buf(size: u64) -> Vec<u8> {
+    vec![0u8; pack_read_buf_size(size)]
+}
+
 /// ``raw_size`` is the size without compress.
+#[derive(Clone)]
 pub struct PObject {
     pub id: String,
     pub loc: PathBuf,
@@ -74,12 +113,14 @@ impl TryFrom<PObject> for ByteString {
 enum PReader {
     Uncompressed(Take<File>),
     Zlib(ZlibDecoder<Take<File>>),
+    Zstd(ZstdDecoder<'static, BufReader<Take<File>>>),
 }
 
 impl Read for PReader {
     fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
         match self {
             PReader::Zlib(inner) => inner.read(buf),
+            PReader::Zstd(inner) => inner.read(buf),
             PReader::Uncompressed(inner) => inner.read(buf),
         }
     }
@@ -89,15 +130,347 @@ impl ReaderMaker for PObject {
     fn make_reader(&self) -> Result<impl Read, crate::Error> {
         let mut f = fs::OpenOptions::new().read(true).open(&self.loc)?;
         f.seek(SeekFrom::Start(self.offset))?;
-        // NOTE: V2 should add support to zstd
         if self.compressed {
-            let rdr = PReader::Zlib(ZlibDecoder::new(f.take(self.size)));
+            let mut header = [0u8; 4];
+            let is_zstd =
+                (&mut f).take(self.size).read_exact(&mut header).is_ok() && header == ZSTD_MAGIC;
+            f.seek(SeekFrom::Start(self.offset))?;
+
+            let rdr = if is_zstd {
+                let buf =
+                    BufReader::with_capacity(pack_read_buf_size(self.size), f.take(self.size));
+                PReader::Zstd(ZstdDecoder::with_buffer(buf)?)
+            } else {
+                let buf = pack_read_buf(self.size);
+                PReader::Zlib(ZlibDecoder::new_with_buf(f.take(self.size), buf))
+            };
             Ok(rdr)
         } else {
             let rdr = PReader::Uncompressed(f.take(self.size));
             Ok(rdr)
         }
     }
+
+    fn size_hint(&self) -> Option<u64> {
+        Some(self.raw_size)
+    }
+}
+
+/// ``PObjectReader`` read content of many ``PObject`` one after another.
+///
+/// Unlike ``make_reader`` which create a new zlib decoder for every object, the decoder is kept
+/// and only its state is reset between objects, so the inflate state and its input buffer are not
+/// reallocated for each of the (usually small) packed objects.
+///
+/// The pack file last read from is also kept open, with objects sorted by pack the pack file is
+/// opened once for all the objects in it instead of once per object.
+///
+/// Objects compressed with zstd are streamed with a new decoder each, only the decompression
+/// context for contents read in memory (``read_run``) is kept.
+#[derive(Default)]
+pub struct PObjectReader {
+    zlib: Option<ZlibDecoder<PackSlice>>,
+    inflate: Option<Decompress>,
+    zstd: Option<zstd::bulk::Decompressor<'static>>,
+    pack: Option<(PathBuf, Arc<File>)>,
+}
+
+/// ``size`` bytes from ``offset`` of a pack file which can be shared by many readers. It reads with
+/// positional reads so no seek is needed when moving to the next object of the same pack.
+struct PackSlice {
+    file: Arc<File>,
+    pos: u64,
+    end: u64,
+}
+
+impl Read for PackSlice {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        let remain = usize::try_from(self.end - self.pos).unwrap_or(usize::MAX);
+        let n = buf.len().min(remain);
+        if n == 0 {
+            return Ok(0);
+        }
+
+        #[cfg(unix)]
+        let n = std::os::unix::fs::FileExt::read_at(&*self.file, &mut buf[..n], self.pos)?;
+        #[cfg(windows)]
+        let n = std::os::windows::fs::FileExt::seek_read(&*self.file, &mut buf[..n], self.pos)?;
+
+        self.pos += n as u64;
+        Ok(n)
+    }
+}
+
+impl PackSlice {
+    /// Whether the content of the slice is a zstd frame, the magic number at its start is read
+    /// without consuming it.
+    fn is_zstd(&self) -> bool {
+        let mut header = [0u8; 4];
+        let mut peek = PackSlice {
+            file: Arc::clone(&self.file),
+            pos: self.pos,
+            end: self.end,
+        };
+        peek.read_exact(&mut header).is_ok() && header == ZSTD_MAGIC
+    }
+}
+
+/// Reader of a single object handed out by ``PObjectReader``, borrow the shared decoder if the
+/// object is compressed.
+enum PObjectSource<'a> {
+    Uncompressed(PackSlice),
+    Zlib(&'a mut ZlibDecoder<PackSlice>),
+    Zstd(ZstdDecoder<'static, BufReader<PackSlice>>),
+}
+
+impl Read for PObjectSource<'_> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        match self {
+            PObjectSource::Zlib(inner) => inner.read(buf),
+            PObjectSource::Zstd(inner) => inner.read(buf),
+            PObjectSource::Uncompressed(inner) => inner.read(buf),
+        }
+    }
+}
+
+impl PObjectReader {
+    #[must_use]
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    fn pack_file(&mut self, loc: &Path) -> Result<Arc<File>, Error> {
+        match &self.pack {
+            Some((cached, f)) if cached == loc => Ok(Arc::clone(f)),
+            _ => {
+                let f = Arc::new(fs::OpenOptions::new().read(true).open(loc)?);
+                self.pack = Some((loc.to_path_buf(), Arc::clone(&f)));
+                Ok(f)
+            }
+        }
+    }
+
+    fn source(&mut self, obj: &PObject) -> Result<PObjectSource<'_>, Error> {
+        let src = PackSlice {
+            file: self.pack_file(&obj.loc)?,
+            pos: obj.offset,
+            end: obj.offset + obj.size,
+        };
+
+        if !obj.compressed {
+            return Ok(PObjectSource::Uncompressed(src));
+        }
+
+        if src.is_zstd() {
+            let buf = BufReader::with_capacity(pack_read_buf_size(obj.size), src);
+            return Ok(PObjectSource::Zstd(ZstdDecoder::with_buffer(buf)?));
+        }
+
+        if let Some(decoder) = self.zlib.as_mut() {
+            decoder.reset(src);
+        } else {
+            // the decoder is reused by all objects, so give it the full size buffer
+            let decoder_buf = vec![0u8; PACK_READ_BUF_SIZE];
+            self.zlib = Some(ZlibDecoder::new_with_buf(src, decoder_buf));
+        }
+        let decoder = self.zlib.as_mut().expect("decoder is set right above");
+        Ok(PObjectSource::Zlib(decoder))
+    }
+
+    /// Read the whole content of ``obj`` and append it to ``buf``, return number of bytes read.
+    pub fn read_to_end(&mut self, obj: &PObject, buf: &mut Vec<u8>) -> Result<u64, Error> {
+        let n = self.source(obj)?.read_to_end(buf)?;
+
+        // FIXME: (v2) use CRC32 checksum, same as converting ``PObject`` to ``ByteString``
+        let n = n as u64;
+        if n == obj.raw_size {
+            Ok(n)
+        } else {
+            Err(Error::UnexpectedCopySize {
+                expected: obj.raw_size,
+                got: n,
+            })
+        }
+    }
+
+    /// Read the content of ``obj`` into ``buf`` which is expected to be exactly ``obj.raw_size``
+    /// long, so the caller can decompress straight into memory it allocated.
+    pub fn read_exact(&mut self, obj: &PObject, buf: &mut [u8]) -> Result<(), Error> {
+        if buf.len() as u64 != obj.raw_size {
+            return Err(Error::UnexpectedCopySize {
+                expected: obj.raw_size,
+                got: buf.len() as u64,
+            });
+        }
+        self.source(obj)?.read_exact(buf)?;
+        Ok(())
+    }
+
+    /// Read the content of ``objs`` which are stored one after another in the same pack. The
+    /// stored bytes of all of them are read at once, then split and decompressed in memory.
+    fn read_run(&mut self, objs: &[&PObject]) -> Result<Vec<ByteString>, Error> {
+        let mut contents = objs
+            .iter()
+            .map(|obj| vec![0u8; usize::try_from(obj.raw_size).unwrap_or_default()])
+            .collect::<Vec<_>>();
+        let mut outs = contents
+            .iter_mut()
+            .map(Vec::as_mut_slice)
+            .collect::<Vec<_>>();
+        self.read_run_into(objs, &mut outs)?;
+        Ok(contents)
+    }
+
+    /// Same as ``read_run`` but the content of ``objs[i]`` is decompressed straight into
+    /// ``outs[i]``, which is expected to be exactly its ``raw_size`` long.
+    fn read_run_into(&mut self, objs: &[&PObject], outs: &mut [&mut [u8]]) -> Result<(), Error> {
+        let (Some(first), Some(last)) = (objs.first(), objs.last()) else {
+            return Ok(());
+        };
+        let (start, end) = (first.offset, last.offset + last.size);
+        let mut stored = vec![0u8; usize::try_from(end - start).unwrap_or_default()];
+        PackSlice {
+            file: self.pack_file(&first.loc)?,
+            pos: start,
+            end,
+        }
+        .read_exact(&mut stored)?;
+
+        for (obj, out) in objs.iter().zip(outs.iter_mut()) {
+            if out.len() as u64 != obj.raw_size {
+                return Err(Error::UnexpectedCopySize {
+                    expected: obj.raw_size,
+                    got: out.len() as u64,
+                });
+            }
+            let begin = usize::try_from(obj.offset - start).unwrap_or_default();
+            let size = usize::try_from(obj.size).unwrap_or_default();
+            let stored = &stored[begin..begin + size];
+
+            let n = if obj.compressed && stored.starts_with(&ZSTD_MAGIC) {
+                if self.zstd.is_none() {
+                    self.zstd = Some(zstd::bulk::Decompressor::new()?);
+                }
+                let zstd = self.zstd.as_mut().expect("decompressor is set right above");
+                // a content larger than its raw size does not fit and fails
+                zstd.decompress_to_buffer(stored, &mut **out)?
+            } else if obj.compressed {
+                let inflate = self.inflate.get_or_insert_with(|| Decompress::new(true));
+                inflate.reset(true);
+                inflate
+                    .decompress(stored, &mut **out, FlushDecompress::Finish)
+                    .map_err(io::Error::from)?;
+                usize::try_from(inflate.total_out()).unwrap_or_default()
+            } else {
+                let n = stored.len().min(out.len());
+                out[..n].copy_from_slice(&stored[..n]);
+                stored.len()
+            };
+
+            // FIXME: (v2) use CRC32 checksum, same as ``read_to_end``
+            if n as u64 != obj.raw_size {
+                return Err(Error::UnexpectedCopySize {
+                    expected: obj.raw_size,
+                    got: n as u64,
+                });
+            }
+        }
+        Ok(())
+    }
+}
+
+/// The order ``objs`` are read in by ``read_many``: the indices of ``objs`` sorted by pack and
+/// offset, and the ranges of these indices that are read together (a run of objects next to each
+/// other in a pack, at most ``PACK_READ_RUN_SIZE`` bytes).
+fn read_runs(objs: &[PObject]) -> (Vec<usize>, Vec<std::ops::Range<usize>>) {
+    let mut order = (0..objs.len()).collect::<Vec<_>>();
+    order.sort_unstable_by_key(|&i| (&objs[i].loc, objs[i].offset));
+
+    let mut runs = vec![];
+    let mut run_start = 0;
+    for k in 1..=order.len() {
+        let run_ends = k == order.len() || {
+            let (prev, obj) = (&objs[order[k - 1]], &objs[order[k]]);
+            obj.loc != prev.loc
+                || obj.offset != prev.offset + prev.size
+                || obj.offset + obj.size - objs[order[run_start]].offset > PACK_READ_RUN_SIZE
+        };
+        if run_ends {
+            runs.push(run_start..k);
+            run_start = k;
+        }
+    }
+    (order, runs)
+}
+
+/// Read the content of all ``objs`` in parallel, contents are returned in the order of ``objs``.
+/// Every worker thread keep its own ``PObjectReader`` so the decoder is still reused within a
+/// thread. The number of threads can be controlled with ``RAYON_NUM_THREADS``.
+///
+/// Objects are read in the order they are stored (by pack and then offset) whatever the order of
+/// ``objs`` is, so every worker reads its pack file forward and the pack file is kept open.
+/// Objects next to each other in a pack are read together with one read of at most
+/// ``PACK_READ_RUN_SIZE`` bytes, a large object is streamed alone.
+pub fn read_many(objs: &[PObject]) -> Result<Vec<ByteString>, Error> {
+    let (order, runs) = read_runs(objs);
+    let runs = runs.into_iter().map(|run| &order[run]).collect::<Vec<_>>();
+
+    let contents = runs
+        .par_iter()
+        .map_init(PObjectReader::new, |rdr, run| {
+            if let [i] = run {
+                let obj = &objs[*i];
+                let mut buf = Vec::with_capacity(usize::try_from(obj.raw_size).unwrap_or_default());
+                rdr.read_to_end(obj, &mut buf)?;
+                Ok(vec![buf])
+            } else {
+                let run = run.iter().map(|&i| &objs[i]).collect::<Vec<_>>();
+                rdr.read_run(&run)
+            }
+        })
+        .collect::<Result<Vec<_>, Error>>()?;
+
+    // back to the order of ``objs``
+    let mut res = vec![ByteString::new(); objs.len()];
+    for (i, content) in order.into_iter().zip(contents.into_iter().flatten()) {
+        res[i] = content;
+    }
+    Ok(res)
+}
+
+/// Same as ``read_many`` but the content of ``objs[i]`` is written into ``bufs[i]``, which must be
+/// exactly its ``raw_size`` long, so the contents go straight to memory of the caller (e.g. one
+/// buffer split for all the objects) without an allocation per object.
+///
+/// # Panics
+///
+/// If there is not one buffer for every object.
+pub fn read_many_into(objs: &[PObject], bufs: Vec<&mut [u8]>) -> Result<(), Error> {
+    assert_eq!(objs.len(), bufs.len(), "one buffer for every object");
+    let (order, runs) = read_runs(objs);
+
+    let mut bufs = bufs.into_iter().map(Some).collect::<Vec<_>>();
+    let runs = runs
+        .into_iter()
+        .map(|run| {
+            let run = &order[run];
+            let outs = run
+                .iter()
+                .map(|&i| bufs[i].take().expect("an object is in one run"))
+                .collect::<Vec<_>>();
+            (run, outs)
+        })
+        .collect::<Vec<_>>();
+
+    runs.into_par_iter()
+        .try_for_each_init(PObjectReader::new, |rdr, (run, mut outs)| {
+            if let ([i], [out]) = (run, outs.as_mut_slice()) {
+                rdr.read_exact(&objs[*i], out)
+            } else {
+                let run = run.iter().map(|&i| &objs[i]).collect::<Vec<_>>();
+                rdr.read_run_into(&run, &mut outs)
+            }
+        })
 }
 
 // XXX: how to combine this with using extract_many???
@@ -153,14 +526,13 @@ where
 
     // TODO: make chunk size configuable
     let _max_chunk_iterate_length = 9500;
-    let in_sql_max_length = 950;
 
     let conn = Connection::open(cnt.packs_db())?;
-    let chunked_iter = _chunked(hashkeys.into_iter(), in_sql_max_length);
+    let chunked_iter = _chunked(hashkeys.into_iter(), EXTRACT_CHUNK_SIZE);
 
     // XXX: why not work??
     // let chunked_iter = std::iter::from_fn(move || {
-    //     let chunk: Vec<_> = hashkeys.into_iter().by_ref().take(in_sql_max_length).collect();
+    //     let chunk: Vec<_> = hashkeys.into_iter().by_ref().take(EXTRACT_CHUNK_SIZE).collect();
     //     if chunk.is_empty() {
     //         None
     //     } else {
@@ -223,6 +595,104 @@ where
     Ok(iter_vec)
 }
 
+// Number of hex characters of the hashkey prefix that ``PackIndex`` buckets by (16 bits).
+const PACK_INDEX_PREFIX_LEN: usize = 4;
+
+fn hashkey_prefix(hashkey: &str) -> Option<usize> {
+    let prefix = hashkey.get(..PACK_INDEX_PREFIX_LEN)?;
+    u16::from_str_radix(prefix, 16).ok().map(usize::from)
+}
+
+/// In memory snapshot of the packs index, for containers that are mostly read.
+///
+/// Entries are sorted by hashkey and bucketed by the first 16 bits of the hashkey, so a lookup is
+/// a binary search among the few entries of one bucket without going through SQLite. It does not
+/// see objects packed after it is loaded, ``extract_many`` looks those up from the DB.
+pub struct PackIndex {
+    packs: PathBuf,
+    entries: Vec<PackEntry>,
+    // ``entries[buckets[p]..buckets[p + 1]]`` are the entries of hashkeys starting with prefix ``p``
+    buckets: Vec<usize>,
+}
+
+impl PackIndex {
+    pub fn load(cnt: &Container) -> Result<Self, Error> {
+        cnt.valid()?;
+        let conn = Connection::open(cnt.packs_db())?;
+        let mut entries = db::select_all(&conn)?;
+        entries.sort_unstable_by(|a, b| a.hashkey.cmp(&b.hashkey));
+
+        let n_buckets = 1 << (PACK_INDEX_PREFIX_LEN * 4);
+        let mut buckets = vec![0; n_buckets + 1];
+        for entry in &entries {
+            if let Some(prefix) = hashkey_prefix(&entry.hashkey) {
+                buckets[prefix + 1] += 1;
+            }
+        }
+        for prefix in 0..n_buckets {
+            buckets[prefix + 1] += buckets[prefix];
+        }
+
+        Ok(Self {
+            packs: cnt.packs(),
+            entries,
+            buckets,
+        })
+    }
+
+    #[must_use]
+    pub fn len(&self) -> usize {
+        self.entries.len()
+    }
+
+    #[must_use]
+    pub fn is_empty(&self) -> bool {
+        self.entries.is_empty()
+    }
+
+    #[must_use]
+    pub fn get(&self, hashkey: &str) -> Option<PObject> {
+        let prefix = hashkey_prefix(hashkey)?;
+        let bucket = &self.entries[self.buckets[prefix]..self.buckets[prefix + 1]];
+        let pn = bucket
+            .binary_search_by(|entry| entry.hashkey.as_str().cmp(hashkey))
+            .ok()
+            .map(|i| &bucket[i])?;
+
+        let loc = self.packs.join(format!("{}", pn.pack_id));
+        Some(PObject::new(
+            &pn.hashkey,
+            loc,
+            pn.offset,
+            pn.raw_size,
+            pn.size,
+            pn.compressed,
+        ))
+    }
+
+    /// Same as ``io_packs::extract_many`` but hashkeys are looked up in the index first, only the
+    /// ones not in it (e.g. packed after the index is loaded) are queried from the DB.
+    pub fn extract_many(
+        &self,
+        hashkeys: &[String],
+        cnt: &Container,
+    ) -> Result<Vec<PObject>, Error> {
+        let mut objs = Vec::with_capacity(hashkeys.len());
+        let mut missing = Vec::new();
+        for hashkey in hashkeys {
+            match self.get(hashkey) {
+                Some(obj) => objs.push(obj),
+                None => missing.push(hashkey),
+            }
+        }
+
+        if !missing.is_empty() {
+            objs.extend(extract_many(missing, cnt)?);
+        }
+        Ok(objs)
+    }
+}
+
 pub fn insert<T>(source: T, cnt: &Container) -> Result<(u64, u64, String), Error>
 where
     T: ReaderMaker,
@@ -237,13 +707,13 @@ where
     // NOTE: this chunk_size is the upbound of the buf, which in order to control the size of
     // memory usage when coping large file. 512 KiB is way larger then the default buffer size in rust
     // (4KiB). Large buffer may increase chance of loosing data.
-    let chunk_size = 524_288; // 512 KiB TODO: make it configurable??
-                              //
+    // 512 KiB TODO: make it configurable??
+    let chunk_size = chunk_size_for(source.size_hint(), 524_288);
     let mut stream = source.make_reader()?;
     let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)
         .map_err(|err| Error::ChunkCopyError { source: err })?;
     let hash = hwriter.ctx.finish();
-    let hash_hex = hex::encode(hash);
+    let hash_hex = hex_digest(hash);
 
     let conn = Connection::open(cnt.packs_db())?;
     if (db::select(&conn, hash_hex.as_str())?).is_some() {
@@ -310,13 +780,20 @@ where
     I::Item: ReaderMaker,
 {
     let compression = cnt.compression()?;
-    _insert_many_internal(sources, cnt, &compression)
+    _insert_many_internal(sources, cnt, &compression, true)
 }
 
+/// When ``validate`` is ``false`` and the hash of a source is already known (see
+/// ``ReaderMaker::expected_hash``), an uncompressed source is copied into the pack as is without
+/// computing its hash again. The copy then runs in kernel (``copy_file_range``/``sendfile``) on linux.
+/// This is the only in kernel copy: when validating, the content is read into user space to be
+/// hashed and written to the pack from there, compressed or not (also by
+/// ``_insert_many_parallel_internal``).
 pub fn _insert_many_internal<I>(
     sources: I,
     cnt: &Container,
     compression: &Compression,
+    validate: bool,
 ) -> Result<Vec<(u64, u64, String)>, Error>
 where
     I: IntoIterator,
@@ -324,16 +801,18 @@ where
 {
     cnt.valid()?;
 
-    let mut conn = Connection::open(cnt.packs_db())?;
+    let mut conn = db::open_for_write(&cnt.packs_db(), cnt.durability)?;
     let packs = cnt.packs();
     let pack_size_target = cnt.config()?.pack_size_target;
 
     // cwp: current working pack
     let mut cwp_id = find_current_pack_id(&cnt.packs(), pack_size_target)?;
     let cwp = cnt.packs().join(format!("{cwp_id}"));
+    // NOTE: not opened in append mode, we seek to the end anyway and the in kernel copy refuses
+    // to write to a file opened with O_APPEND.
     let mut cwp = fs::OpenOptions::new()
         .create(true)
-        .append(true)
+        .write(true)
         .read(true)
         .open(cwp)?;
     let mut offset = cwp.seek(io::SeekFrom::End(0))?;
@@ -363,50 +842,8 @@ where
         }
 
         for rmaker in sources.by_ref() {
-            // NOTE: Using small chunk_size can be fast in terms of benchmark.
-            // Ideally should accept a hint for buffer size (loose -> packs)
-            // 64 KiB from legacy dos  TODO: make it configurable??
-            let chunk_size = 65_536;
-
-            // XXX: for if need to do the valitation for the hash, the idea is to having an object
-            // encapsulate the pre-computed hash (better with cheap checksum). For Readers that has no pre-compute hash it return
-            // None. The method is from ReaderMaker and calling rmaker.expected_hash(). If the hash
-            // already exist and do not need to run validation, the writer can be normal writer without
-            // hash.
-
-            let mut stream = rmaker.make_reader()?;
-
             let (bytes_read, hash_hex, compressed) =
-                match (compression, rmaker.maybe_content_format()) {
-                    (Compression::Zlib(level), Ok(MaybeContentFormat::MaybeLargeText)) => {
-                        let writer = ZlibEncoder::new(&mut cwp, flate2::Compression::new(*level));
-                        let mut hwriter = HashWriter::new(writer, dig_algo);
-                        let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
-
-                        let hash = hwriter.finish();
-                        let hash_hex = hex::encode(hash);
-
-                        (bytes_copied, hash_hex, true)
-                    }
-                    (Compression::Zstd(lv), Ok(MaybeContentFormat::MaybeLargeText)) => {
-                        let mut writer = ZstdEncoder::new(&mut cwp, *lv)?;
-                        let mut hwriter = HashWriter::new(&mut writer, dig_algo);
-                        let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
-
-                        let hash = hwriter.finish();
-                        let hash_hex = hex::encode(hash);
-
-                        (bytes_copied, hash_hex, true)
-                    }
-                    _ => {
-                        let mut hwriter = HashWriter::new(&mut cwp, dig_algo);
-                        let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
-                        let hash = hwriter.ctx.finish();
-                        let hash_hex = hex::encode(hash);
-
-                        (bytes_copied, hash_hex, false)
-                    }
-                };
+                append_streamed(&rmaker, &mut cwp, compression, validate, dig_algo)?;
 
             // look at the end of cwp compute how many bytes had been written
             let bytes_write = cwp.stream_position()? - offset;
@@ -437,6 +874,371 @@ where
     Ok(nbytes_hash)
 }
 
+/// Append the content of ``rmaker`` to the pack ``cwp`` while it is read, hashed and (if it is
+/// worth to) compressed chunk by chunk, so an object is never held in memory whatever its size.
+/// Return the number of bytes read, the hash and whether the object is compressed.
+fn append_streamed<T, W>(
+    rmaker: &T,
+    cwp: &mut W,
+    compression: &Compression,
+    validate: bool,
+    dig_algo: &'static digest::Algorithm,
+) -> Result<(u64, String, bool), Error>
+where
+    T: ReaderMaker,
+    W: Write,
+{
+    // NOTE: Using small chunk_size can be fast in terms of benchmark.
+    // The buffer is no larger than the object if its size is known (loose -> packs).
+    // 64 KiB from legacy dos  TODO: make it configurable??
+    let chunk_size = chunk_size_for(rmaker.size_hint(), 65_536);
+
+    // XXX: for if need to do the valitation for the hash, the idea is to having an object
+    // encapsulate the pre-computed hash (better with cheap checksum). For Readers that has no pre-compute hash it return
+    // None. The method is from ReaderMaker and calling rmaker.expected_hash(). If the hash
+    // already exist and do not need to run validation, the writer can be normal writer without
+    // hash.
+
+    let mut stream = rmaker.make_reader()?;
+
+    // Guessing the content format opens and reads the source one more time, only do it
+    // when the object may end up compressed.
+    let content_format = content_format_for(rmaker, compression);
+
+    let appended = match (compression, content_format) {
+        (Compression::Zlib(level), Some(MaybeContentFormat::MaybeLargeText)) => {
+            let writer = ZlibEncoder::new(&mut *cwp, flate2::Compression::new(*level));
+            let mut hwriter = HashWriter::new(writer, dig_algo);
+            let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
+
+            let hash = hwriter.finish();
+            let hash_hex = hex_digest(hash);
+
+            (bytes_copied, hash_hex, true)
+        }
+        (Compression::Zstd(lv), Some(MaybeContentFormat::MaybeLargeText)) => {
+            let mut writer = ZstdEncoder::new(&mut *cwp, *lv)?;
+            let mut hwriter = HashWriter::new(&mut writer, dig_algo);
+            let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
+
+            let hash = hwriter.finish();
+            let hash_hex = hex_digest(hash);
+            // the zstd frame is only complete once the encoder is finished
+            writer.finish()?;
+
+            (bytes_copied, hash_hex, true)
+        }
+        _ if !validate && rmaker.expected_hash().is_some() => {
+            // std::io::copy between two files is done by the kernel without
+            // passing the content through user space.
+            let bytes_copied = io::copy(&mut stream, cwp)?;
+            let hash_hex = rmaker.expected_hash().expect("checked in the match guard");
+
+            (bytes_copied, hash_hex, false)
+        }
+        _ => {
+            let mut hwriter = HashWriter::new(&mut *cwp, dig_algo);
+            let bytes_copied = copy_by_chunk(&mut stream, &mut hwriter, chunk_size)?;
+            let hash = hwriter.ctx.finish();
+            let hash_hex = hex_digest(hash);
+
+            (bytes_copied, hash_hex, false)
+        }
+    };
+    Ok(appended)
+}
+
+/// The content format of ``rmaker`` to decide whether it is compressed, ``None`` if it is stored as
+/// is anyway: compression is off or the content is known to be smaller than ``MIN_COMPRESS_SIZE``.
+fn content_format_for<T>(rmaker: &T, compression: &Compression) -> Option<MaybeContentFormat>
+where
+    T: ReaderMaker,
+{
+    match compression {
+        Compression::Uncompressed => None,
+        _ if rmaker.size_hint().is_some_and(|n| n < MIN_COMPRESS_SIZE) => None,
+        _ => rmaker.maybe_content_format().ok(),
+    }
+}
+
+/// Same as ``content_format_for`` for a source whose ``content`` is already read into memory.
+fn content_format_of<T>(
+    rmaker: &T,
+    compression: &Compression,
+    content: &[u8],
+) -> Option<MaybeContentFormat>
+where
+    T: ReaderMaker,
+{
+    match compression {
+        Compression::Uncompressed => None,
+        _ if (content.len() as u64) < MIN_COMPRESS_SIZE => None,
+        _ => rmaker.maybe_content_format_of(content).ok(),
+    }
+}
+
+/// The compressed ``data`` of a content of ``raw_size`` bytes, ``None`` if it is not smaller than
+/// the content which is then better stored as is.
+fn smaller_than_raw(data: Vec<u8>, raw_size: u64) -> Option<Vec<u8>> {
+    ((data.len() as u64) < raw_size).then_some(data)
+}
+
+// Number of objects hashed and compressed in parallel before they are written to the pack, bound
+// the memory used by the compressed objects waiting to be written.
+const PARALLEL_INSERT_BATCH: usize = 1024;
+
+// Total size of the objects in one batch, 256 MiB. Large objects (e.g. packing loose) would
+// otherwise hold up to ``PARALLEL_INSERT_BATCH`` compressed contents in memory at once.
+const PARALLEL_INSERT_BATCH_BYTES: u64 = 268_435_456;
+
+// Largest object (in bytes) read into memory to be encoded in parallel when its size is only known
+// once it is opened, so is not accounted in the batch size: a full batch of such objects is then
+// still within ``PARALLEL_INSERT_BATCH_BYTES``. 256 KiB.
+const PARALLEL_INSERT_UNSIZED_MAX_BYTES: u64 =
+    PARALLEL_INSERT_BATCH_BYTES / PARALLEL_INSERT_BATCH as u64;
+
+// Least number of objects a worker takes from a batch, hashing a tiny object costs less than
+// splitting the work and ``map_init`` sets up a new encoder for every split.
+const PARALLEL_INSERT_MIN_LEN: usize = 64;
+
+// Size of the buffer the objects are appended to the pack through, 1 MiB
+const PACK_WRITE_BUF_SIZE: usize = 1_048_576;
+
+/// An object ready to be appended to the pack. ``data`` is what is written to the pack, the
+/// compressed content or (if ``compressed`` is false) the raw content read when hashing.
+struct EncodedObject {
+    raw_size: u64,
+    hash_hex: String,
+    data: Vec<u8>,
+    compressed: bool,
+}
+
+/// A source as it is handed to the write step of ``_insert_many_parallel_internal``, encoded in
+/// memory or, if it is too large to be held in memory, ``Streamed``: it is read, hashed and
+/// compressed only when it is appended, the same as ``_insert_many_internal`` does.
+enum Encoded {
+    InMemory(EncodedObject),
+    Streamed,
+}
+
+/// Per worker state for encoding objects. The zlib encoder (the deflate state is a few hundred
+/// KiB) is reset and reused between objects instead of being allocated for every object.
+#[derive(Default)]
+struct ObjectEncoder {
+    zlib: Option<ZlibEncoder<Vec<u8>>>,
+}
+
+impl ObjectEncoder {
+    fn encode<T>(
+        &mut self,
+        rmaker: &T,
+        compression: &Compression,
+        dig_algo: &'static digest::Algorithm,
+    ) -> Result<Encoded, Error>
+    where
+        T: ReaderMaker,
+    {
+        let (mut stream, size) = rmaker.make_sized_reader()?;
+        let in_memory = match (rmaker.size_hint(), size) {
+            // accounted in the batch size, an object larger than a batch is alone in its batch
+            (Some(n), _) => n <= PARALLEL_INSERT_BATCH_BYTES,
+            (None, Some(n)) => n <= PARALLEL_INSERT_UNSIZED_MAX_BYTES,
+            (None, None) => false,
+        };
+        if !in_memory {
+            return Ok(Encoded::Streamed);
+        }
+
+        // The source is read once into one allocation sized for it: the content that is hashed is
+        // the content that is compressed, or written as is if it is not compressed (or does not
+        // get smaller).
+        let capacity = size
+            .and_then(|n| usize::try_from(n).ok())
+            .unwrap_or_default();
+        let mut raw = Vec::with_capacity(capacity);
+        stream.read_to_end(&mut raw)?;
+        let raw_size = raw.len() as u64;
+        let hash_hex = hex_digest(digest::digest(dig_algo, &raw));
+
+        let data = match (compression, content_format_of(rmaker, compression, &raw)) {
+            (Compression::Zlib(level), Some(MaybeContentFormat::MaybeLargeText)) => {
+                // the level is the same for all objects of one insert
+                let encoder = self.zlib.get_or_insert_with(|| {
+                    ZlibEncoder::new(Vec::new(), flate2::Compression::new(*level))
+                });
+                // the compressed content is expected to be smaller than the raw content
+                encoder.get_mut().reserve(raw.len());
+                encoder.write_all(&raw)?;
+
+                // finish the stream and take the output out, the encoder is ready for next object
+                Some(encoder.reset(Vec::new())?)
+            }
+            (Compression::Zstd(lv), Some(MaybeContentFormat::MaybeLargeText)) => {
+                let mut encoder = ZstdEncoder::new(Vec::with_capacity(raw.len()), *lv)?;
+                encoder.write_all(&raw)?;
+                Some(encoder.finish()?)
+            }
+            _ => None,
+        };
+
+        let encoded = match data.and_then(|data| smaller_than_raw(data, raw_size)) {
+            Some(data) => EncodedObject {
+                raw_size,
+                hash_hex,
+                data,
+                compressed: true,
+            },
+            None => EncodedObject {
+                raw_size,
+                hash_hex,
+                data: raw,
+                compressed: false,
+            },
+        };
+        Ok(Encoded::InMemory(encoded))
+    }
+}
+
+/// Split ``sources`` in batches of at most ``PARALLEL_INSERT_BATCH`` objects whose total size (if
+/// known) is at most ``PARALLEL_INSERT_BATCH_BYTES``, a batch has at least one object.
+fn batches<T: ReaderMaker>(sources: &[T]) -> impl Iterator<Item = &[T]> {
+    let mut rest = sources;
+    std::iter::from_fn(move || {
+        if rest.is_empty() {
+            return None;
+        }
+        let mut nbytes = 0;
+        let mut n = 0;
+        for rmaker in rest.iter().take(PARALLEL_INSERT_BATCH) {
+            nbytes += rmaker.size_hint().unwrap_or_default();
+            if n > 0 && nbytes > PARALLEL_INSERT_BATCH_BYTES {
+                break;
+            }
+            n += 1;
+        }
+        let (batch, tail) = rest.split_at(n);
+        rest = tail;
+        Some(batch)
+    })
+}
+
+/// Same as ``_insert_many_internal`` (with validation) for sources that can be shared between
+/// threads, e.g. contents already in memory. Hashing and compressing are done in parallel for a
+/// batch of sources, and only appending them to the pack is serial, in the order of ``sources``.
+/// A batch is appended to the pack while the next batch is encoded, so the disk writes are hidden
+/// behind the compression (at most two batches are in memory). An object too large to be held in
+/// memory (see ``ObjectEncoder::encode``) is streamed to the pack by the write step instead.
+pub fn _insert_many_parallel_internal<T>(
+    sources: &[T],
+    cnt: &Container,
+    compression: &Compression,
+) -> Result<Vec<(u64, u64, String)>, Error>
+where
+    T: ReaderMaker + Sync,
+{
+    cnt.valid()?;
+
+    let mut conn = db::open_for_write(&cnt.packs_db(), cnt.durability)?;
+    let packs = cnt.packs();
+    let pack_size_target = cnt.config()?.pack_size_target;
+
+    // cwp: current working pack
+    let mut cwp_id = find_current_pack_id(&packs, pack_size_target)?;
+    let mut f = fs::OpenOptions::new()
+        .create(true)
+        .write(true)
+        .read(true)
+        .open(packs.join(format!("{cwp_id}")))?;
+    let mut offset = f.seek(io::SeekFrom::End(0))?;
+    // the small objects of a batch are appended through the buffer, so they go to the pack in a
+    // few large writes instead of one write syscall per object.
+    let mut cwp = BufWriter::with_capacity(PACK_WRITE_BUF_SIZE, f);
+    let dig_algo = &digest::SHA256;
+
+    let mut nbytes_hash = Vec::with_capacity(sources.len());
+
+    let encode = |batch: &[T]| {
+        batch
+            .par_iter()
+            .with_min_len(PARALLEL_INSERT_MIN_LEN)
+            .map_init(ObjectEncoder::default, |encoder, rmaker| {
+                encoder.encode(rmaker, compression, dig_algo)
+            })
+            .collect::<Result<Vec<_>, Error>>()
+    };
+
+    let mut write_batch = |batch: &[T], encoded: Vec<Encoded>| -> Result<(), Error> {
+        // transaction for every batch writing
+        let tx = conn.transaction()?;
+        let mut stmt = tx.prepare_cached("INSERT OR IGNORE INTO db_object (hashkey, compressed, size, offset, length, pack_id) VALUES (?1, ?2, ?3, ?4, ?5, ?6)")?;
+        for (rmaker, obj) in batch.iter().zip(encoded) {
+            if offset >= pack_size_target {
+                // move to new pack
+                cwp_id += 1;
+                offset = 0;
+                let p = Dir(&packs).at_path(&format!("{cwp_id}"));
+                cwp.flush()?;
+                cwp = BufWriter::with_capacity(
+                    PACK_WRITE_BUF_SIZE,
+                    fs::OpenOptions::new()
+                        .create(true)
+                        .write(true)
+                        .truncate(true)
+                        .open(p)?,
+                );
+            }
+
+            let (raw_size, hash_hex, compressed, bytes_write) = match obj {
+                Encoded::InMemory(obj) => {
+                    cwp.write_all(&obj.data)?;
+                    let bytes_write = obj.data.len() as u64;
+                    (obj.raw_size, obj.hash_hex, obj.compressed, bytes_write)
+                }
+                Encoded::Streamed => {
+                    let (raw_size, hash_hex, compressed) =
+                        append_streamed(rmaker, &mut cwp, compression, true, dig_algo)?;
+                    // flush what is buffered to know where the object ends
+                    let bytes_write = cwp.stream_position()? - offset;
+                    (raw_size, hash_hex, compressed, bytes_write)
+                }
+            };
+
+            stmt.execute(params![
+                &hash_hex,
+                compressed,
+                raw_size,
+                offset,
+                bytes_write,
+                cwp_id,
+            ])
+            .map_err(|err| Error::SQLiteInsertError { source: err })?;
+            offset += bytes_write;
+
+            nbytes_hash.push((raw_size, bytes_write, hash_hex));
+        }
+        drop(stmt);
+        // the objects must be in the pack before they are in the index
+        cwp.flush()?;
+        tx.commit()?;
+        Ok(())
+    };
+
+    let mut remaining = batches(sources);
+    let mut next = remaining.next().map(|batch| (batch, encode(batch)));
+    while let Some((batch, encoded)) = next {
+        let encoded = encoded?;
+        let following = remaining.next();
+        let (written, encoded_next) = rayon::join(
+            || write_batch(batch, encoded),
+            || following.map(|batch| (batch, encode(batch))),
+        );
+        written?;
+        next = encoded_next;
+    }
+
+    Ok(nbytes_hash)
+}
+
 #[cfg(test)]
 mod tests {
     use rstest::*;
@@ -593,6 +1395,7 @@ mod tests {
     #[case("none")]
     #[case("zlib+1")]
     #[case("zlib:+9")]
+    #[case("zstd:+1")]
     fn io_packs_extract_many(#[case] algo: &str) {
         let (_tmp_dir, cnt) = new_container(64, algo);
 
@@ -631,10 +1434,280 @@ mod tests {
         assert_eq!(count + 2, hashkeys.len());
     }
 
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_read_many(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(64, algo);
+
+        let mut hash_content_map: HashMap<String, String> = HashMap::new();
+        for i in 0..100 {
+            let content = format!("test {i}").repeat(i);
+            let buf = content.clone().into_bytes();
+            let (_, _, hash) = insert(buf, &cnt).unwrap();
+            hash_content_map.insert(hash, content);
+        }
+
+        let objs = extract_many(hash_content_map.keys(), &cnt)
+            .unwrap()
+            .collect::<Vec<_>>();
+        let contents = read_many(&objs).unwrap();
+        assert_eq!(contents.len(), 100);
+        for (obj, content) in objs.iter().zip(contents) {
+            assert_eq!(
+                String::from_utf8(content).unwrap(),
+                hash_content_map.get(&obj.id).unwrap().to_owned()
+            );
+        }
+    }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_read_many_one_pack(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(1024 * 1024, algo);
+
+        // all in one pack, next to each other, and read back in another order
+        let sources = (0..100)
+            .map(|i| format!("test {i}").repeat(i).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = insert_many(sources.clone(), &cnt).unwrap();
+        let hashkeys = results
+            .iter()
+            .rev()
+            .map(|(_, _, hash)| hash.clone())
+            .collect::<Vec<_>>();
+
+        let objs = extract_many(&hashkeys, &cnt).unwrap().collect::<Vec<_>>();
+        let contents = read_many(&objs).unwrap();
+        assert_eq!(contents.len(), 100);
+        let hash_content_map = results
+            .into_iter()
+            .map(|(_, _, hash)| hash)
+            .zip(sources)
+            .collect::<HashMap<_, _>>();
+        for (obj, content) in objs.iter().zip(contents) {
+            assert_eq!(&content, hash_content_map.get(&obj.id).unwrap());
+        }
+    }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_read_many_into(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(1024, algo);
+
+        // some in one run, some in another pack, read back in another order
+        let sources = (0..100)
+            .map(|i| format!("test {i}").repeat(i).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = insert_many(sources.clone(), &cnt).unwrap();
+        let hashkeys = results
+            .iter()
+            .rev()
+            .map(|(_, _, hash)| hash.clone())
+            .collect::<Vec<_>>();
+
+        let objs = extract_many(&hashkeys, &cnt).unwrap().collect::<Vec<_>>();
+        let mut buf = vec![0u8; objs.iter().map(|obj| obj.raw_size as usize).sum()];
+        let mut bufs = Vec::new();
+        let mut rest = buf.as_mut_slice();
+        for obj in &objs {
+            let (out, tail) = rest.split_at_mut(obj.raw_size as usize);
+            bufs.push(out);
+            rest = tail;
+        }
+        read_many_into(&objs, bufs).unwrap();
+
+        let hash_content_map = results
+            .into_iter()
+            .map(|(_, _, hash)| hash)
+            .zip(sources)
+            .collect::<HashMap<_, _>>();
+        let mut offset = 0;
+        for obj in &objs {
+            let size = obj.raw_size as usize;
+            assert_eq!(
+                &buf[offset..offset + size],
+                hash_content_map.get(&obj.id).unwrap().as_slice()
+            );
+            offset += size;
+        }
+    }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_insert_many_parallel(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(64, algo);
+        let compression = cnt.compression().unwrap();
+
+        let sources = (0..100)
+            .map(|i| format!("test {i}").repeat(i).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = _insert_many_parallel_internal(&sources, &cnt, &compression).unwrap();
+        assert_eq!(results.len(), 100);
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, 100);
+
+        // same hashkeys and in the same order as the serial insert
+        let (_tmp_dir_serial, cnt_serial) = new_container(64, algo);
+        let results_serial = insert_many(sources.clone(), &cnt_serial).unwrap();
+        for ((raw_size, _, hash), (raw_size_serial, _, hash_serial)) in
+            results.iter().zip(&results_serial)
+        {
+            assert_eq!(raw_size, raw_size_serial);
+            assert_eq!(hash, hash_serial);
+        }
+
+        let mut rdr = PObjectReader::new();
+        let mut buf = Vec::new();
+        for ((_, _, hash), content) in results.iter().zip(sources) {
+            let obj = extract(hash, &cnt).unwrap().unwrap();
+            buf.clear();
+            rdr.read_to_end(&obj, &mut buf).unwrap();
+            assert_eq!(buf, content);
+        }
+    }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_insert_many_parallel_batches(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(PACK_TARGET_SIZE, algo);
+        let compression = cnt.compression().unwrap();
+
+        // next batch is encoded while the previous one is written
+        let n = 2 * PARALLEL_INSERT_BATCH + 1;
+        let sources = (0..n)
+            .map(|i| format!("test {i}").repeat(20).into_bytes())
+            .collect::<Vec<ByteString>>();
+        let results = _insert_many_parallel_internal(&sources, &cnt, &compression).unwrap();
+        assert_eq!(results.len(), n);
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, n as u64);
+
+        let mut rdr = PObjectReader::new();
+        let mut buf = Vec::new();
+        for ((_, _, hash), content) in results.iter().zip(sources) {
+            let obj = extract(hash, &cnt).unwrap().unwrap();
+            buf.clear();
+            rdr.read_to_end(&obj, &mut buf).unwrap();
+            assert_eq!(buf, content);
+        }
+    }
+
+    #[test]
+    fn io_packs_parallel_batches() {
+        let sources = vec![&b""[..]; PARALLEL_INSERT_BATCH + 1];
+        let lens: Vec<_> = batches(&sources).map(<[_]>::len).collect();
+        assert_eq!(lens, vec![PARALLEL_INSERT_BATCH, 1]);
+
+        // the size is only read from ``size_hint``, the large objects are never read
+        let large = PObject::new("", "", 0, PARALLEL_INSERT_BATCH_BYTES / 2 + 1, 0, false);
+        let sources = vec![large.clone(), large.clone(), large];
+        let lens: Vec<_> = batches(&sources).map(<[_]>::len).collect();
+        assert_eq!(lens, vec![1, 1, 1]);
+
+        assert_eq!(batches::<&[u8]>(&[]).count(), 0);
+    }
+
+    #[test]
+    fn io_packs_insert_tiny_not_compressed() {
+        let (_tmp_dir, cnt) = new_container(64, "zlib+1");
+        let compression = cnt.compression().unwrap();
+
+        // tiny content is stored as is, the text compress well
+        let sources: Vec<ByteString> = vec![b"tiny".to_vec(), b"text ".repeat(1000)];
+        let results = _insert_many_parallel_internal(&sources, &cnt, &compression).unwrap();
+
+        let mut rdr = PObjectReader::new();
+        let mut buf = Vec::new();
+        for ((_, _, hash), (content, compressed)) in
+            results.iter().zip(sources.iter().zip([false, true]))
+        {
+            let obj = extract(hash, &cnt).unwrap().unwrap();
+            assert_eq!(obj.compressed, compressed);
+            buf.clear();
+            rdr.read_to_end(&obj, &mut buf).unwrap();
+            assert_eq!(&buf, content);
+        }
+    }
+
+    #[test]
+    fn io_packs_pack_index() {
+        let (_tmp_dir, cnt) = new_container(64, "none");
+
+        let mut hash_content_map: HashMap<String, String> = HashMap::new();
+        for i in 0..100 {
+            let content = format!("test {i}");
+            let buf = content.clone().into_bytes();
+            let (_, _, hash) = insert(buf, &cnt).unwrap();
+            hash_content_map.insert(hash, content);
+        }
+
+        let index = PackIndex::load(&cnt).unwrap();
+        assert_eq!(index.len(), 100);
+        for (hash, content) in &hash_content_map {
+            let obj = index.get(hash).unwrap();
+            assert_eq!(
+                String::from_utf8(obj.try_into().unwrap()).unwrap(),
+                *content
+            );
+        }
+        assert!(index
+            .get("68e2056a0496c469727fa5ab041e1778e39137643fd24db94dd7a532db17aaba")
+            .is_none());
+        assert!(index.get("xx").is_none());
+
+        // objects packed after the index is loaded are found from the DB
+        let (_, _, new_hash) = insert(b"test new".to_vec(), &cnt).unwrap();
+        assert!(index.get(&new_hash).is_none());
+        let mut hashkeys = hash_content_map.keys().cloned().collect::<Vec<_>>();
+        hashkeys.push(new_hash);
+        let objs = index.extract_many(&hashkeys, &cnt).unwrap();
+        assert_eq!(objs.len(), 101);
+    }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn io_packs_pobject_reader_reuse(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(64, algo);
+
+        let mut hash_content_map: HashMap<String, String> = HashMap::new();
+        for i in 0..100 {
+            let content = format!("test {i}").repeat(i);
+            let buf = content.clone().into_bytes();
+            let (_, _, hash) = insert(buf, &cnt).unwrap();
+            hash_content_map.insert(hash, content);
+        }
+
+        // one reader for all objects spread over many packs, the decoder is reused between objects
+        // and the pack file is reopened only when moving to another pack
+        let mut rdr = PObjectReader::new();
+        let mut buf = Vec::new();
+        for (hash, content) in hash_content_map {
+            let obj = extract(&hash, &cnt).unwrap().unwrap();
+            buf.clear();
+            rdr.read_to_end(&obj, &mut buf).unwrap();
+            assert_eq!(String::from_utf8(buf.clone()).unwrap(), content);
+        }
+    }
+
     #[rstest]
     #[case("none")]
     #[case("zlib+1")]
     #[case("zlib:+9")]
+    #[case("zstd:+1")]
     /// Test if the content size is larger than the copy chunk size (64KiB)
     fn io_packs_extract_many_large_content(#[case] algo: &str) {
         let (_tmp_dir, cnt) = new_container(64 * 1024 * 1024, algo);
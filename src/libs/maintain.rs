@@ -1,15 +1,24 @@
 use rusqlite::Connection;
+use std::collections::HashSet;
+use std::fs;
 
 use crate::container::{traverse_loose, Compression, Container};
+use crate::io_loose::LooseFile;
 use crate::{io_packs, Error};
 
 pub fn pack_loose(cnt: &Container) -> Result<(), Error> {
     let compression = cnt.compression()?;
-    _pack_loose_internal(cnt, &compression)
+    _pack_loose_internal(cnt, &compression, true)
 }
 
-// XXX: flag to set if do the validate, if no, use reguler writer not hash writer.
-pub fn _pack_loose_internal(cnt: &Container, compression: &Compression) -> Result<(), Error> {
+/// If ``validate`` is ``false`` the hash is taken from the loose filename instead of being
+/// recomputed from the content, which let uncompressed objects be copied to packs in kernel.
+/// With ``validate`` (the default of ``pack_loose``) every object passes through user space.
+pub fn _pack_loose_internal(
+    cnt: &Container,
+    compression: &Compression,
+    validate: bool,
+) -> Result<(), Error> {
     cnt.valid()?;
 
     let loose_objs = traverse_loose(cnt)?;
@@ -19,24 +28,33 @@ pub fn _pack_loose_internal(cnt: &Container, compression: &Compression) -> Resul
     // NOTE: for large packed DB this operation can be performance bottleneck
     let conn = Connection::open(cnt.packs_db())?;
     let mut stmt = conn.prepare("SELECT hashkey FROM db_object")?;
-    let rows: Vec<_> = stmt
+    let rows: HashSet<_> = stmt
         .query([])?
         .mapped(|row| row.get::<_, String>(0))
         .filter_map(std::result::Result::ok)
         .collect();
 
-    let sources = loose_objs.filter(|obj| {
-        let hash = obj.parent().and_then(|p| p.file_name()).and_then(|parent| {
-            obj.file_name().map(|filename| {
-                format!("{}{}", parent.to_str().unwrap(), filename.to_str().unwrap())
-            })
-        });
-        hash.map_or(false, |h| !rows.contains(&h))
+    let sources = loose_objs.filter_map(|obj| {
+        let parent = obj.parent()?.file_name()?.to_str()?;
+        let hash = format!("{}{}", parent, obj.file_name()?.to_str()?);
+        if rows.contains(&hash) {
+            return None;
+        }
+        // the size is taken from the file once it is opened for packing, not stat-ed here
+        Some(LooseFile::new(hash, obj))
     });
 
     // race may happened during packing, I pass path as iterator which can be modified or doesn't
     // catch newly added objects to loose folder.
-    io_packs::_insert_many_internal(sources, cnt, compression)?;
+    if validate {
+        // every object is read to compute its hash, so hash and compress them in parallel. The
+        // paths are collected first, the content is only read when the object is encoded, and
+        // large objects are streamed to the pack rather than read into memory.
+        let sources: Vec<_> = sources.collect();
+        io_packs::_insert_many_parallel_internal(&sources, cnt, compression)?;
+    } else {
+        io_packs::_insert_many_internal(sources, cnt, compression, validate)?;
+    }
 
     // XXX: the goal is unclear in legacy dos, there are following reasons that can cause the hash
     // mismatched:
@@ -58,6 +76,22 @@ pub fn _pack_loose_internal(cnt: &Container, compression: &Compression) -> Resul
     Ok(())
 }
 
+/// Drop all packed objects, their rows are deleted from the packs DB and the pack files removed,
+/// loose objects are kept. The DB and the folders stay as they are so the container does not need
+/// to be initialized again, which makes it cheap to reset a throwaway container (e.g. between
+/// benchmark rounds). Packed objects that are not also in loose are lost.
+pub fn clear_packs(cnt: &Container) -> Result<(), Error> {
+    cnt.valid()?;
+
+    let conn = Connection::open(cnt.packs_db())?;
+    conn.execute("DELETE FROM db_object", [])?;
+    for entry in fs::read_dir(cnt.packs())? {
+        fs::remove_file(entry?.path())?;
+    }
+
+    Ok(())
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -66,6 +100,7 @@ mod tests {
     use crate::io_packs::extract as packs_extract;
     use crate::stat;
     use crate::test_utils::new_container;
+    use rstest::*;
     use std::collections::HashMap;
 
     #[test]
@@ -98,6 +133,31 @@ mod tests {
         }
     }
 
+    #[test]
+    fn pack_loose_no_validate() {
+        let (_tmp_dir, cnt) = new_container(1024, "none");
+        let n = 200;
+
+        let mut hash_content_map: HashMap<String, String> = HashMap::new();
+        for i in 0..n {
+            let content = format!("test {i:03}"); // 8 bytes each
+            let buf = content.clone().into_bytes();
+            let (_, hash) = loose_insert(buf, &cnt).unwrap();
+            hash_content_map.insert(hash, content);
+        }
+
+        // hash is taken from loose filename and content is copied as it is
+        _pack_loose_internal(&cnt, &Compression::Uncompressed, false).unwrap();
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, n);
+
+        for (hash, content) in hash_content_map {
+            let obj = packs_extract(&hash, &cnt).unwrap().unwrap();
+            assert_eq!(String::from_utf8(obj.try_into().unwrap()).unwrap(), content);
+        }
+    }
+
     #[test]
     fn pack_loose_default_compress() {
         let (_tmp_dir, cnt) = new_container(1024, "zlib:+1");
@@ -125,4 +185,60 @@ mod tests {
             assert_eq!(String::from_utf8(obj.try_into().unwrap()).unwrap(), content);
         }
     }
+
+    #[rstest]
+    #[case("none")]
+    #[case("zlib+1")]
+    #[case("zstd:+1")]
+    fn pack_loose_large(#[case] algo: &str) {
+        let (_tmp_dir, cnt) = new_container(1024, algo);
+
+        // 1 MiB objects are larger than what is read into memory to be packed in parallel, so
+        // they are streamed into the pack in between the small objects.
+        let large_text = b"large text ".repeat(100_000);
+        let large_binary = (0..1_048_576).map(|_| rand::random::<u8>()).collect();
+        let mut contents = vec![large_text, large_binary];
+        contents.extend((0..10).map(|i| format!("test {i:03}").into_bytes()));
+
+        let mut hashes = Vec::new();
+        for content in &contents {
+            let (_, hash) = loose_insert(content.clone(), &cnt).unwrap();
+            hashes.push(hash);
+        }
+
+        pack_loose(&cnt).unwrap();
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, contents.len() as u64);
+
+        for (hash, content) in hashes.iter().zip(contents) {
+            let obj = packs_extract(hash, &cnt).unwrap().unwrap();
+            let got: Vec<u8> = obj.try_into().unwrap();
+            assert_eq!(got, content);
+        }
+    }
+
+    #[test]
+    fn clear_packs_keep_loose() {
+        let (_tmp_dir, cnt) = new_container(1024, "none");
+        let n = 200;
+
+        for i in 0..n {
+            let content = format!("test {i:03}"); // 8 bytes each
+            loose_insert(content.into_bytes(), &cnt).unwrap();
+        }
+        pack_loose(&cnt).unwrap();
+
+        clear_packs(&cnt).unwrap();
+
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, 0);
+        assert_eq!(info.count.packs_file, 0);
+        assert_eq!(info.count.loose, n);
+
+        // can be packed again as it was never packed
+        pack_loose(&cnt).unwrap();
+        let info = stat(&cnt).unwrap();
+        assert_eq!(info.count.packs, n);
+    }
 }